@@ -1,9 +1,17 @@
 import torch
+import torch.nn.functional as F
 import asyncio
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from collections import OrderedDict
 from pathlib import Path
 import gc
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from packaging import version
+from PIL import Image
 
 from diffusers import (
     StableDiffusionPipeline,
@@ -13,30 +21,120 @@ from diffusers import (
     EulerAncestralDiscreteScheduler
 )
 from transformers import CLIPTextModel, CLIPTokenizer
-import safetensors.torch as safetensors
+from safetensors import safe_open
 
 from ..utils.config import settings
 from ..utils.logger import setup_logger
 
+try:
+    import xformers  # Optional; only used when SDPA attention is unavailable
+except ImportError:
+    xformers = None
+
 logger = setup_logger(__name__)
 
+ANIME_ENHANCERS = ("anime style", "high quality", "detailed", "masterpiece", "best quality")
+
+ART_STYLE_ENHANCERS = {
+    "kawaii": ("cute", "kawaii", "adorable"),
+    "realistic": ("realistic", "photorealistic", "detailed"),
+    "chibi": ("chibi", "cute", "small"),
+}
+
+COLOR_PALETTE_ENHANCERS = {
+    "vibrant": ("vibrant colors", "colorful"),
+    "pastel": ("pastel colors", "soft colors"),
+    "monochrome": ("monochrome", "black and white"),
+}
+
+ANIME_NEGATIVES = (
+    "lowres", "bad anatomy", "bad hands", "text", "error", "missing fingers",
+    "extra digit", "fewer digits", "cropped", "worst quality", "low quality",
+    "normal quality", "jpeg artifacts", "signature", "watermark", "username",
+    "blurry", "extra limbs", "malformed limbs"
+)
+
+PROMPT_EMBEDS_CACHE_SIZE = 256
+
+THUMBNAIL_SIZE = 256
+
+# How long the batch worker waits for more image requests to coalesce
+BATCH_WINDOW_SECONDS = 0.01
+
+LORA_DTYPES = {"fp16": torch.float16, "bf16": torch.bfloat16}
+
+# Release numbers only, so pre-release / source builds like "2.1.0a0+git..." count as 2.1
+TORCH_VERSION = version.parse(str(torch.__version__)).release[:2]
+
+# Rough fp16 activation footprint of one frame (CFG doubled) per output pixel
+FRAME_ACTIVATION_BYTES_PER_PIXEL = 5 * 1024
+
 class ModelManager:
     def __init__(self):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.dtype = torch.float16 if self.device == "cuda" else torch.float32
+        self.lora_dtype = LORA_DTYPES.get(settings.LORA_DTYPE, self.dtype)
+        self.unet_dtype = str(self.dtype)
+        
+        if self.device == "cuda":
+            # Let cuDNN pick the fastest conv algorithms and allow TF32 for fp32 matmuls
+            torch.backends.cudnn.benchmark = True
+            torch.set_float32_matmul_precision("high")
+            
+            # Route scaled_dot_product_attention to the fused flash / mem-efficient kernels
+            torch.backends.cuda.enable_flash_sdp(True)
+            torch.backends.cuda.enable_mem_efficient_sdp(True)
+            torch.backends.cuda.enable_math_sdp(False)
         
         self.text2img_pipeline: Optional[StableDiffusionPipeline] = None
         self.img2img_pipeline: Optional[StableDiffusionImg2ImgPipeline] = None
         
+        # Reseeded per request instead of allocating new generators each call.
+        # Only touched from the GPU executor thread, which serializes access.
+        self._generators: List[torch.Generator] = []
+        
+        # All GPU work runs on this single thread, keeping the event loop free
+        # and CUDA graphs captured on the thread that replays them
+        self._gpu_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gpu")
+        
+        # Image requests are coalesced into batched pipeline calls by a worker task
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batch_worker_task: Optional[asyncio.Task] = None
+        
+        # Small components reused on every request stay resident on the GPU
+        self.exclude_from_offload = ["text_encoder", "vae"]
+        
+        # Hook of the last whole-model offloaded component, when model offload is used
+        self._offload_hook = None
+        
         self.models_cache = {}
         self.lora_cache = {}
         
+        # Prompt suffixes for every known (art_style, color_palette) combination
+        self._suffix_table: Dict[Tuple[Optional[str], Optional[str]], str] = {
+            (art_style, color_palette): ", ".join(
+                ANIME_ENHANCERS
+                + ART_STYLE_ENHANCERS.get(art_style, ())
+                + COLOR_PALETTE_ENHANCERS.get(color_palette, ())
+            )
+            for art_style in (None, *ART_STYLE_ENHANCERS)
+            for color_palette in (None, *COLOR_PALETTE_ENHANCERS)
+        }
+        self._negative_suffix = ", ".join(ANIME_NEGATIVES)
+        
+        # Encoded prompts, reused while the text encoder is unchanged
+        self._cached_neg_embeds: Optional[torch.Tensor] = None
+        self._prompt_embeds_cache: OrderedDict[str, torch.Tensor] = OrderedDict()
+        
         logger.info(f"Initialized ModelManager with device: {self.device}")
 
     async def initialize(self):
         """Initialize the AI models"""
         logger.info("🔄 Initializing AI models...")
         
+        # Let the caching allocator grow segments instead of fragmenting (read on first CUDA alloc)
+        os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
+        
         try:
             # Load base Stable Diffusion model
             await self._load_base_model()
@@ -47,6 +145,13 @@ class ModelManager:
             # Optimize models
             await self._optimize_models()
             
+            # Encode the default negative prompt once
+            self._cache_negative_embeds()
+            
+            # Start coalescing image requests
+            self._batch_queue = asyncio.Queue(maxsize=settings.IMAGE_QUEUE_SIZE)
+            self._batch_worker_task = asyncio.create_task(self._batch_worker())
+            
             logger.info("✅ AI models initialized successfully")
             
         except Exception as e:
@@ -69,31 +174,33 @@ class ModelManager:
             requires_safety_checker=False,
         )
         
-        # Image-to-Image Pipeline
-        self.img2img_pipeline = StableDiffusionImg2ImgPipeline.from_pretrained(
-            model_id,
-            torch_dtype=self.dtype,
-            cache_dir=cache_dir,
-            safety_checker=None,
-            requires_safety_checker=False,
-        )
-        
         # Move to device
         self.text2img_pipeline = self.text2img_pipeline.to(self.device)
-        self.img2img_pipeline = self.img2img_pipeline.to(self.device)
         
-        # Set scheduler
+        # Set scheduler (DPM-Solver++ 2M Karras converges in ~15 steps)
         self.text2img_pipeline.scheduler = DPMSolverMultistepScheduler.from_config(
-            self.text2img_pipeline.scheduler.config
+            self.text2img_pipeline.scheduler.config,
+            algorithm_type="dpmsolver++",
+            use_karras_sigmas=True,
+            solver_order=2
         )
+        
+        # Image-to-Image Pipeline shares the text2img modules (already on device)
+        self.img2img_pipeline = StableDiffusionImg2ImgPipeline(**self.text2img_pipeline.components)
+        
+        # Schedulers are stateful during sampling, so give img2img its own instance
         self.img2img_pipeline.scheduler = DPMSolverMultistepScheduler.from_config(
-            self.img2img_pipeline.scheduler.config
+            self.text2img_pipeline.scheduler.config
         )
 
     async def _load_anime_lora(self):
         """Load anime-specific LoRA weights"""
         logger.info("Loading anime LoRA weights...")
         
+        # LoRA changes the text encoder, so cached embeddings are stale
+        self._cached_neg_embeds = None
+        self._prompt_embeds_cache.clear()
+        
         try:
             # Popular anime LoRA models
             anime_loras = [
@@ -109,42 +216,234 @@ class ModelManager:
                 }
             ]
             
+            adapter_names = []
+            adapter_weights = []
+            
             for lora_config in anime_loras:
                 lora_path = Path(lora_config["path"])
                 if lora_path.exists():
-                    # Load LoRA weights
-                    lora_weights = safetensors.load_file(lora_path)
+                    # Load LoRA weights as a named adapter (shared with img2img)
+                    self.text2img_pipeline.load_lora_weights(
+                        self._read_lora_file(lora_path),
+                        adapter_name=lora_config["name"]
+                    )
+                    adapter_names.append(lora_config["name"])
+                    adapter_weights.append(lora_config["weight"])
                     self.lora_cache[lora_config["name"]] = {
-                        "weights": lora_weights,
+                        "path": str(lora_path),
                         "weight": lora_config["weight"]
                     }
                     logger.info(f"Loaded LoRA: {lora_config['name']}")
                 else:
                     logger.warning(f"LoRA file not found: {lora_path}")
+            
+            if adapter_names:
+                # Fold the weighted LoRA deltas into the base weights once; fuse_lora merges the
+                # active adapters at their set_adapters weights (diffusers 0.24 takes no adapter_names)
+                self.text2img_pipeline.set_adapters(adapter_names, adapter_weights=adapter_weights)
+                self.text2img_pipeline.fuse_lora(lora_scale=1.0)
+                logger.info(f"✅ Fused LoRA adapters: {adapter_names}")
                     
         except Exception as e:
             logger.warning(f"Failed to load LoRA weights: {e}")
 
+    def _read_lora_file(self, lora_path: Path) -> Dict[str, torch.Tensor]:
+        """Read LoRA tensors straight onto the target device, skipping CPU staging"""
+        
+        lora_weights = {}
+        with safe_open(str(lora_path), framework="pt", device=self.device) as f:
+            for key in f.keys():
+                tensor = f.get_tensor(key)
+                # Alpha scalars keep their stored precision to preserve the LoRA scale
+                if not key.endswith(".alpha"):
+                    tensor = tensor.to(dtype=self.lora_dtype, non_blocking=True)
+                lora_weights[key] = tensor
+        
+        return lora_weights
+
     async def _optimize_models(self):
         """Optimize models for better performance"""
         logger.info("Optimizing models...")
         
         if self.device == "cuda":
-            # Enable memory efficient attention
+            # Use torch SDPA (FlashAttention-2 / mem-efficient kernels) for attention
             try:
-                self.text2img_pipeline.enable_xformers_memory_efficient_attention()
-                self.img2img_pipeline.enable_xformers_memory_efficient_attention()
-                logger.info("✅ Enabled xformers memory efficient attention")
+                from diffusers.models.attention_processor import AttnProcessor2_0
+                
+                # UNet is shared between the text2img and img2img pipelines
+                self.text2img_pipeline.unet.set_attn_processor(AttnProcessor2_0())
+                logger.info("✅ Enabled SDPA attention")
+            except ImportError:
+                # Fall back to xformers on diffusers builds without SDPA support
+                if xformers is None:
+                    logger.warning("SDPA attention unavailable and xformers not installed; using default attention")
+                else:
+                    try:
+                        self.text2img_pipeline.enable_xformers_memory_efficient_attention()
+                        logger.info("✅ Enabled xformers memory efficient attention")
+                    except Exception as e:
+                        logger.warning(f"Failed to enable xformers: {e}")
             except Exception as e:
-                logger.warning(f"Failed to enable xformers: {e}")
+                logger.warning(f"Failed to enable SDPA attention: {e}")
             
-            # Enable model CPU offload for large models
-            try:
-                self.text2img_pipeline.enable_model_cpu_offload()
-                self.img2img_pipeline.enable_model_cpu_offload()
-                logger.info("✅ Enabled model CPU offload")
-            except Exception as e:
-                logger.warning(f"Failed to enable CPU offload: {e}")
+            # Decode large outputs in spatial tiles / per-image slices to cap peak VRAM
+            vae = self.text2img_pipeline.vae
+            vae.enable_tiling()
+            vae.enable_slicing()
+            
+            # Quantize before compiling so the compiled graph uses the quantized kernels
+            if settings.QUANTIZE_UNET:
+                try:
+                    self._quantize_unet()
+                except Exception as e:
+                    logger.warning(f"Failed to quantize UNet: {e}")
+            
+            # Offload weights to CPU only on low-VRAM nodes
+            if settings.LOW_VRAM:
+                try:
+                    self._enable_group_offload()
+                except Exception as e:
+                    logger.warning(f"Failed to enable CPU offload: {e}")
+            
+            # CUDA graph capture does not compose with offload hooks
+            elif settings.COMPILE_UNET and TORCH_VERSION >= (2, 1):
+                try:
+                    self._compile_models()
+                    await asyncio.get_running_loop().run_in_executor(
+                        self._gpu_executor, self._warmup_compiled_models
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to compile models: {e}")
+
+    def _quantize_unet(self):
+        """Quantize UNet linear layers with torchao (FP8 on Ada/Hopper, int8 weights otherwise)"""
+        
+        from torchao.quantization import (
+            quantize_,
+            int8_weight_only,
+            float8_dynamic_activation_float8_weight
+        )
+        
+        if torch.cuda.get_device_capability() >= (8, 9):
+            quantize_(self.text2img_pipeline.unet, float8_dynamic_activation_float8_weight())
+            self.unet_dtype = "fp8_dq"
+        else:
+            quantize_(self.text2img_pipeline.unet, int8_weight_only())
+            self.unet_dtype = "int8_wo"
+        
+        logger.info(f"✅ Quantized UNet to {self.unet_dtype}")
+
+    @contextmanager
+    def _inference_context(self):
+        """Inference mode, with fp16 autocast on CUDA for any stray fp32 ops
+        
+        With whole-model offload, the last offloaded component returns to the CPU afterwards.
+        """
+        
+        try:
+            with torch.inference_mode(), torch.autocast(
+                device_type="cuda", dtype=torch.float16, enabled=self.device == "cuda"
+            ):
+                yield
+        finally:
+            if self._offload_hook is not None:
+                self._offload_hook.offload()
+
+    def _compile_models(self):
+        """Compile the UNet and VAE decoder into replayable CUDA graphs"""
+        
+        import torch._dynamo
+        
+        # One cache entry per warmed (resolution, batch size) shape, so none falls back to eager
+        warmup_shapes = len(settings.COMPILE_RESOLUTIONS) * len(self._warmup_batch_sizes())
+        torch._dynamo.config.cache_size_limit = max(torch._dynamo.config.cache_size_limit, warmup_shapes)
+        
+        unet = torch.compile(self.text2img_pipeline.unet, mode="reduce-overhead", fullgraph=False)
+        self.text2img_pipeline.unet = unet
+        self.img2img_pipeline.unet = unet
+        
+        vae = self.text2img_pipeline.vae
+        vae.decode = torch.compile(vae.decode, mode="reduce-overhead")
+
+    def _warmup_batch_sizes(self) -> range:
+        """Every batch size the image batcher or frame micro-batching can send to the UNet"""
+        return range(1, max(settings.MAX_IMAGE_BATCH, settings.MAX_FRAME_BATCH) + 1)
+
+    def _warmup_compiled_models(self):
+        """Capture graphs for every compiled shape so the first request skips it
+        
+        Covers each compiled resolution at each batch size (CFG doubles the UNet batch),
+        so coalesced image batches and frame micro-batches never record graphs mid-request.
+        """
+        
+        for size in settings.COMPILE_RESOLUTIONS:
+            for batch_size in self._warmup_batch_sizes():
+                with self._inference_context():
+                    self.text2img_pipeline(
+                        prompt=[""] * batch_size,
+                        width=size,
+                        height=size,
+                        num_inference_steps=1
+                    )
+        
+        logger.info(
+            f"✅ Compiled UNet for resolutions {settings.COMPILE_RESOLUTIONS} "
+            f"at batch sizes 1-{self._warmup_batch_sizes()[-1]}"
+        )
+
+    def _enable_group_offload(self):
+        """Stream model blocks from CPU, overlapping transfers with compute"""
+        
+        try:
+            from diffusers.hooks import apply_group_offloading
+        except ImportError:
+            # Older diffusers releases (e.g. the pinned 0.24) have no group offload
+            self._enable_model_offload()
+            return
+        
+        onload_device = torch.device(self.device)
+        offload_device = torch.device("cpu")
+        
+        # Components are shared with the img2img pipeline, so hook them once
+        for name in ("unet", "vae", "text_encoder"):
+            component = getattr(self.text2img_pipeline, name)
+            if name in self.exclude_from_offload:
+                component.to(onload_device)
+                continue
+            
+            component.to(offload_device)
+            apply_group_offloading(
+                component,
+                onload_device=onload_device,
+                offload_device=offload_device,
+                offload_type="block_level",
+                num_blocks_per_group=1,
+                use_stream=True
+            )
+        
+        logger.info("✅ Enabled stream-overlapped group offload")
+
+    def _enable_model_offload(self):
+        """Move whole components to the GPU when they run, keeping excluded ones resident"""
+        
+        from accelerate import cpu_offload_with_hook
+        
+        onload_device = torch.device(self.device)
+        
+        # Each offloaded component's hook evicts the previous one, in pipeline order
+        hook = None
+        for name in ("text_encoder", "unet", "vae"):
+            component = getattr(self.text2img_pipeline, name)
+            if name in self.exclude_from_offload:
+                component.to(onload_device)
+                continue
+            
+            _, hook = cpu_offload_with_hook(component, onload_device, prev_module_hook=hook)
+        
+        # The last one has no successor to evict it, so it is offloaded after each inference
+        self._offload_hook = hook
+        
+        logger.info(f"✅ Enabled model CPU offload for all but {self.exclude_from_offload}")
 
     async def generate_image(
         self,
@@ -152,100 +451,197 @@ class ModelManager:
         negative_prompt: str = "",
         width: int = 512,
         height: int = 512,
-        num_inference_steps: int = 20,
+        num_inference_steps: int = settings.DEFAULT_STEPS,
         guidance_scale: float = 7.5,
         seed: Optional[int] = None,
         style_settings: Optional[Dict[str, Any]] = None
-    ) -> torch.Tensor:
-        """Generate an anime-style image from text prompt"""
+    ) -> Tuple[Image.Image, Image.Image]:
+        """Generate an anime-style image and its thumbnail from text prompt"""
         
         try:
             # Apply anime style enhancements
-            enhanced_prompt = self._enhance_anime_prompt(prompt, style_settings)
-            enhanced_negative = self._get_anime_negative_prompt(negative_prompt)
+            request = {
+                "prompt": self._enhance_anime_prompt(prompt, style_settings),
+                "negative_prompt": negative_prompt,
+                "seed": seed,
+                "batch_key": (width, height, num_inference_steps, guidance_scale)
+            }
             
-            # Set random seed if provided
-            if seed is not None:
-                torch.manual_seed(seed)
+            # Queue for the batch worker, which may coalesce it with concurrent requests
+            future = asyncio.get_running_loop().create_future()
+            await self._batch_queue.put((request, future))
             
-            # Generate image
-            with torch.no_grad():
-                result = self.text2img_pipeline(
-                    prompt=enhanced_prompt,
-                    negative_prompt=enhanced_negative,
-                    width=width,
-                    height=height,
-                    num_inference_steps=num_inference_steps,
-                    guidance_scale=guidance_scale,
-                    generator=torch.Generator(device=self.device).manual_seed(seed) if seed else None
-                )
-            
-            return result.images[0]
+            return await future
             
         except Exception as e:
             logger.error(f"Image generation failed: {e}")
             raise
 
+    async def _batch_worker(self):
+        """Coalesce queued image requests into batched pipeline calls"""
+        
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            pending = [await self._batch_queue.get()]
+            
+            # Collect whatever else arrives within the batching window
+            deadline = loop.time() + BATCH_WINDOW_SECONDS
+            while len(pending) < settings.MAX_IMAGE_BATCH:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self._batch_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Only requests with matching shape/steps/guidance can share a call
+            groups: Dict[tuple, list] = {}
+            for request, future in pending:
+                if not future.cancelled():
+                    groups.setdefault(request["batch_key"], []).append((request, future))
+            
+            for group in groups.values():
+                try:
+                    results = await loop.run_in_executor(
+                        self._gpu_executor,
+                        self._run_image_batch,
+                        [request for request, _ in group]
+                    )
+                except Exception as e:
+                    for _, future in group:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                
+                for (_, future), result in zip(group, results):
+                    if not future.done():
+                        future.set_result(result)
+
+    def _run_image_batch(self, requests: list) -> List[Tuple[Image.Image, Image.Image]]:
+        """Run one text2img pipeline call for a group of compatible requests"""
+        
+        width, height, num_inference_steps, guidance_scale = requests[0]["batch_key"]
+        
+        prompt_embeds = torch.cat([self._get_prompt_embeds(r["prompt"]) for r in requests])
+        negative_prompt_embeds = torch.cat([self._get_negative_embeds(r["negative_prompt"]) for r in requests])
+        
+        with self._inference_context():
+            result = self.text2img_pipeline(
+                prompt_embeds=prompt_embeds,
+                negative_prompt_embeds=negative_prompt_embeds,
+                width=width,
+                height=height,
+                num_inference_steps=num_inference_steps,
+                guidance_scale=guidance_scale,
+                generator=self._get_generators([r["seed"] for r in requests]),
+                output_type="pt"
+            )
+        
+        # Keep the decoded tensor on device so thumbnails are resized there too
+        images = result.images
+        image_processor = self.text2img_pipeline.image_processor
+        pil_images = image_processor.numpy_to_pil(image_processor.pt_to_numpy(images))
+        
+        return [
+            (image, self._make_thumbnail(images[i:i + 1]))
+            for i, image in enumerate(pil_images)
+        ]
+
+    def _get_generators(self, seeds: List[Optional[int]]) -> List[torch.Generator]:
+        """Reseed pooled generators, one per batch entry"""
+        
+        while len(self._generators) < len(seeds):
+            self._generators.append(torch.Generator(device=self.device))
+        
+        for generator, seed in zip(self._generators, seeds):
+            if seed is not None:
+                generator.manual_seed(seed)
+            else:
+                generator.seed()
+        
+        return self._generators[:len(seeds)]
+
+    def _make_thumbnail(self, images: torch.Tensor) -> Image.Image:
+        """Downscale a decoded (1, 3, H, W) image tensor to a thumbnail"""
+        
+        _, _, height, width = images.shape
+        scale = min(1.0, THUMBNAIL_SIZE / max(height, width))
+        size = (max(1, round(height * scale)), max(1, round(width * scale)))
+        
+        thumbnail = F.interpolate(images.float(), size=size, mode="area").clamp(0, 1)
+        
+        image_processor = self.text2img_pipeline.image_processor
+        return image_processor.numpy_to_pil(image_processor.pt_to_numpy(thumbnail))[0]
+
     def _enhance_anime_prompt(self, prompt: str, style_settings: Optional[Dict[str, Any]] = None) -> str:
         """Enhance prompt with anime-specific terms"""
         
-        anime_enhancers = [
-            "anime style",
-            "high quality",
-            "detailed",
-            "masterpiece",
-            "best quality"
-        ]
+        style_settings = style_settings or {}
+        art_style = style_settings.get("art_style")
+        color_palette = style_settings.get("color_palette")
         
-        if style_settings:
-            # Add style-specific enhancements
-            if style_settings.get("art_style") == "kawaii":
-                anime_enhancers.extend(["cute", "kawaii", "adorable"])
-            elif style_settings.get("art_style") == "realistic":
-                anime_enhancers.extend(["realistic", "photorealistic", "detailed"])
-            elif style_settings.get("art_style") == "chibi":
-                anime_enhancers.extend(["chibi", "cute", "small"])
-            
-            # Add color palette
-            if style_settings.get("color_palette") == "vibrant":
-                anime_enhancers.extend(["vibrant colors", "colorful"])
-            elif style_settings.get("color_palette") == "pastel":
-                anime_enhancers.extend(["pastel colors", "soft colors"])
-            elif style_settings.get("color_palette") == "monochrome":
-                anime_enhancers.extend(["monochrome", "black and white"])
+        # Unknown styles get only the base enhancers
+        key = (
+            art_style if art_style in ART_STYLE_ENHANCERS else None,
+            color_palette if color_palette in COLOR_PALETTE_ENHANCERS else None
+        )
         
-        enhanced_prompt = f"{prompt}, {', '.join(anime_enhancers)}"
-        return enhanced_prompt
+        return f"{prompt}, {self._suffix_table[key]}"
 
     def _get_anime_negative_prompt(self, negative_prompt: str = "") -> str:
         """Get anime-optimized negative prompt"""
         
-        anime_negatives = [
-            "lowres",
-            "bad anatomy",
-            "bad hands",
-            "text",
-            "error",
-            "missing fingers",
-            "extra digit",
-            "fewer digits",
-            "cropped",
-            "worst quality",
-            "low quality",
-            "normal quality",
-            "jpeg artifacts",
-            "signature",
-            "watermark",
-            "username",
-            "blurry",
-            "extra limbs",
-            "malformed limbs"
-        ]
-        
         if negative_prompt:
-            return f"{negative_prompt}, {', '.join(anime_negatives)}"
+            return f"{negative_prompt}, {self._negative_suffix}"
         else:
-            return ', '.join(anime_negatives)
+            return self._negative_suffix
+
+    def _get_prompt_embeds(self, prompt: str) -> torch.Tensor:
+        """Get CLIP embeddings for a prompt, reusing recent encodings"""
+        
+        prompt_embeds = self._prompt_embeds_cache.get(prompt)
+        if prompt_embeds is not None:
+            self._prompt_embeds_cache.move_to_end(prompt)
+            return prompt_embeds
+        
+        with self._inference_context():
+            prompt_embeds = self.text2img_pipeline.encode_prompt(
+                prompt,
+                device=self.device,
+                num_images_per_prompt=1,
+                do_classifier_free_guidance=False
+            )[0]
+        
+        self._prompt_embeds_cache[prompt] = prompt_embeds
+        if len(self._prompt_embeds_cache) > PROMPT_EMBEDS_CACHE_SIZE:
+            self._prompt_embeds_cache.popitem(last=False)
+        
+        return prompt_embeds
+
+    def _cache_negative_embeds(self):
+        """Encode the default anime negative prompt so requests skip a CLIP pass"""
+        
+        try:
+            with self._inference_context():
+                self._cached_neg_embeds = self.text2img_pipeline.encode_prompt(
+                    self._get_anime_negative_prompt(""),
+                    device=self.device,
+                    num_images_per_prompt=1,
+                    do_classifier_free_guidance=False
+                )[0]
+        except Exception as e:
+            logger.warning(f"Failed to cache negative prompt embeddings: {e}")
+            self._cached_neg_embeds = None
+
+    def _get_negative_embeds(self, negative_prompt: str) -> torch.Tensor:
+        """Get negative prompt embeddings, preferring the cached default"""
+        
+        if not negative_prompt and self._cached_neg_embeds is not None:
+            return self._cached_neg_embeds
+        
+        return self._get_prompt_embeds(self._get_anime_negative_prompt(negative_prompt))
 
     async def generate_video_frames(
         self,
@@ -253,44 +649,94 @@ class ModelManager:
         num_frames: int = 24,
         width: int = 512,
         height: int = 512,
-        **kwargs
+        negative_prompt: str = "",
+        num_inference_steps: int = settings.DEFAULT_STEPS,
+        guidance_scale: float = 7.5,
+        seed: Optional[int] = None,
+        style_settings: Optional[Dict[str, Any]] = None
     ) -> list:
         """Generate multiple frames for video creation"""
         
         frames = []
+        base_seed = seed if seed is not None else 42
+        batch_size = self._get_frame_batch_size(width, height)
         
         try:
-            for i in range(num_frames):
+            # Denoise frames in micro-batches so the UNet runs batched kernels
+            for batch_start in range(0, num_frames, batch_size):
+                frame_indices = range(batch_start, min(batch_start + batch_size, num_frames))
+                
                 # Add slight variation to each frame
-                frame_prompt = f"{prompt}, frame {i+1}"
-                seed = kwargs.get('seed', 42) + i
+                prompts = [
+                    self._enhance_anime_prompt(f"{prompt}, frame {i+1}", style_settings)
+                    for i in frame_indices
+                ]
+                seeds = [base_seed + i for i in frame_indices]
                 
-                frame = await self.generate_image(
-                    prompt=frame_prompt,
-                    width=width,
-                    height=height,
-                    seed=seed,
-                    **{k: v for k, v in kwargs.items() if k != 'seed'}
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._gpu_executor,
+                    partial(
+                        self._run_pipeline,
+                        prompt=prompts,
+                        negative_prompt=negative_prompt,
+                        width=width,
+                        height=height,
+                        num_inference_steps=num_inference_steps,
+                        guidance_scale=guidance_scale,
+                        seeds=seeds
+                    )
                 )
                 
-                frames.append(frame)
-                
-                # Clear cache periodically
-                if i % 5 == 0:
-                    torch.cuda.empty_cache() if self.device == "cuda" else None
+                frames.extend(result.images)
             
             return frames
             
         except Exception as e:
             logger.error(f"Video frame generation failed: {e}")
             raise
+        
+        finally:
+            # Release cached blocks once per video rather than mid-generation
+            if self.device == "cuda":
+                torch.cuda.empty_cache()
+
+    def _run_pipeline(self, seeds: List[Optional[int]], negative_prompt: str = "", **kwargs):
+        """Run the text2img pipeline on the GPU executor thread"""
+        
+        negative_prompt_embeds = self._get_negative_embeds(negative_prompt)
+        negative_prompt_embeds = negative_prompt_embeds.expand(len(kwargs["prompt"]), -1, -1)
+        
+        with self._inference_context():
+            return self.text2img_pipeline(
+                generator=self._get_generators(seeds),
+                negative_prompt_embeds=negative_prompt_embeds,
+                **kwargs
+            )
+
+    def _get_frame_batch_size(self, width: int, height: int) -> int:
+        """Pick how many frames to denoise per pipeline call"""
+        
+        if self.device != "cuda":
+            return 1
+        
+        free_bytes, _ = torch.cuda.mem_get_info()
+        per_frame_bytes = width * height * FRAME_ACTIVATION_BYTES_PER_PIXEL
+        batch_size = int(free_bytes // per_frame_bytes)
+        
+        return max(1, min(batch_size, settings.MAX_FRAME_BATCH))
 
     async def cleanup(self):
         """Clean up models and free memory"""
         logger.info("🧹 Cleaning up AI models...")
         
         try:
+            if self._batch_worker_task:
+                self._batch_worker_task.cancel()
+            self._gpu_executor.shutdown(wait=True)
+            
             if self.text2img_pipeline:
+                if self.lora_cache:
+                    self.text2img_pipeline.unload_lora_weights()
                 del self.text2img_pipeline
             if self.img2img_pipeline:
                 del self.img2img_pipeline
@@ -314,6 +760,7 @@ class ModelManager:
         return {
             "device": self.device,
             "dtype": str(self.dtype),
+            "unet_dtype": self.unet_dtype,
             "text2img_loaded": self.text2img_pipeline is not None,
             "img2img_loaded": self.img2img_pipeline is not None,
             "lora_models": list(self.lora_cache.keys()),
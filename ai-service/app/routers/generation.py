@@ -1,13 +1,14 @@
 import asyncio
+import os
 import uuid
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Literal, Tuple
 from pathlib import Path
 import io
 import base64
 
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request
-from fastapi.responses import FileResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import FileResponse, Response
+from pydantic import BaseModel, Field, model_validator
 from PIL import Image
 import torch
 
@@ -16,12 +17,28 @@ from ..services.video_service import VideoService
 from ..services.audio_service import AudioService
 from ..utils.config import settings
 from ..utils.logger import setup_logger
-from ..utils.file_utils import save_image, save_video, cleanup_temp_files
+from ..utils.file_utils import save_image, save_video, cleanup_temp_files, OUTPUT_MEDIA_TYPES
 
 logger = setup_logger(__name__)
 router = APIRouter()
 
-class ImageGenerationRequest(BaseModel):
+# Quality loss is negligible at 256px; skip the extra optimize/progressive passes
+THUMBNAIL_JPEG_OPTIONS = {"quality": 80, "optimize": False, "progressive": False}
+
+# Most output IDs kept in the in-memory index; older ones fall back to extension probing
+OUTPUT_INDEX_SIZE = 10_000
+
+class QualityPresetRequest(BaseModel):
+    quality: Optional[Literal["draft", "standard", "high"]] = Field(None, description="Quality preset; overrides num_inference_steps")
+    
+    @model_validator(mode="after")
+    def apply_quality_preset(self):
+        """Map the quality preset onto a step count"""
+        if self.quality:
+            self.num_inference_steps = settings.QUALITY_STEPS[self.quality]
+        return self
+
+class ImageGenerationRequest(QualityPresetRequest):
     prompt: str = Field(..., max_length=settings.MAX_PROMPT_LENGTH)
     negative_prompt: str = Field("", max_length=settings.MAX_PROMPT_LENGTH)
     width: int = Field(settings.DEFAULT_WIDTH, ge=64, le=settings.MAX_WIDTH)
@@ -32,7 +49,7 @@ class ImageGenerationRequest(BaseModel):
     style: Optional[Dict[str, Any]] = Field(default_factory=dict)
     output_id: str = Field(..., description="Unique identifier for the output")
 
-class VideoGenerationRequest(BaseModel):
+class VideoGenerationRequest(QualityPresetRequest):
     prompt: str = Field(..., max_length=settings.MAX_PROMPT_LENGTH)
     negative_prompt: str = Field("", max_length=settings.MAX_PROMPT_LENGTH)
     width: int = Field(settings.DEFAULT_WIDTH, ge=64, le=settings.MAX_WIDTH)
@@ -54,24 +71,69 @@ class GenerationResponse(BaseModel):
     metadata: Dict[str, Any]
     processing_time: float
 
+def _save_thumbnail(image: Image.Image, thumbnail_path: Path) -> None:
+    """Downscale and save a JPEG thumbnail"""
+    
+    # Bilinear is visually indistinguishable from Lanczos at these sizes
+    resample = Image.Resampling.BILINEAR if max(image.size) <= 1024 else Image.Resampling.LANCZOS
+    
+    thumbnail = image.copy()
+    thumbnail.thumbnail((256, 256), resample)
+    thumbnail.save(thumbnail_path, "JPEG", **THUMBNAIL_JPEG_OPTIONS)
+
 def get_model_manager(request: Request) -> ModelManager:
     """Dependency to get the model manager from app state"""
     return request.app.state.model_manager
 
+def get_output_index(request: Request) -> Dict[str, Tuple[Path, str]]:
+    """Dependency to get the output ID -> (path, media type) index from app state"""
+    if not hasattr(request.app.state, "output_index"):
+        request.app.state.output_index = {}
+    return request.app.state.output_index
+
+def _index_output(
+    output_index: Dict[str, Tuple[Path, str]],
+    output_id: str,
+    output_path: Path,
+    media_type: str
+) -> None:
+    """Register an output in the index, dropping the oldest entries beyond OUTPUT_INDEX_SIZE"""
+    output_index.pop(output_id, None)
+    output_index[output_id] = (output_path, media_type)
+    while len(output_index) > OUTPUT_INDEX_SIZE:
+        del output_index[next(iter(output_index))]
+
+def _write_output(
+    output_index: Dict[str, Tuple[Path, str]],
+    output_id: str,
+    output_path: Path,
+    data: bytes,
+    media_type: str
+) -> None:
+    """Write output bytes to disk and register them in the output index"""
+    output_path.write_bytes(data)
+    _index_output(output_index, output_id, output_path, media_type)
+
 @router.post("/image", response_model=GenerationResponse)
 async def generate_image(
     request: ImageGenerationRequest,
     background_tasks: BackgroundTasks,
-    model_manager: ModelManager = Depends(get_model_manager)
+    inline: bool = False,
+    model_manager: ModelManager = Depends(get_model_manager),
+    output_index: Dict[str, Tuple[Path, str]] = Depends(get_output_index)
 ):
-    """Generate an anime-style image from text prompt"""
+    """Generate an anime-style image from text prompt
+    
+    With ``?inline=true`` the PNG bytes are returned directly and the disk
+    copy is written in the background.
+    """
     
     logger.info(f"Starting image generation for output_id: {request.output_id}")
     start_time = asyncio.get_event_loop().time()
     
     try:
         # Generate image
-        image = await model_manager.generate_image(
+        image, thumbnail = await model_manager.generate_image(
             prompt=request.prompt,
             negative_prompt=request.negative_prompt,
             width=request.width,
@@ -86,27 +148,32 @@ async def generate_image(
         output_path = Path(settings.OUTPUT_DIR) / f"{request.output_id}.png"
         thumbnail_path = Path(settings.OUTPUT_DIR) / f"{request.output_id}_thumb.jpg"
         
-        # Save full resolution image
-        image.save(output_path, "PNG", quality=95)
+        # Encode full resolution image off the event loop (zlib level 1 keeps deflate cheap)
+        buffer = io.BytesIO()
+        await asyncio.to_thread(image.save, buffer, "PNG", compress_level=1)
+        png_bytes = buffer.getvalue()
+        
+        if not inline:
+            await asyncio.to_thread(
+                _write_output, output_index, request.output_id, output_path, png_bytes, "image/png"
+            )
         
-        # Create thumbnail
-        thumbnail = image.copy()
-        thumbnail.thumbnail((256, 256), Image.Resampling.LANCZOS)
-        thumbnail.save(thumbnail_path, "JPEG", quality=85)
+        # Save thumbnail (already downscaled on the model device)
+        await asyncio.to_thread(thumbnail.save, thumbnail_path, "JPEG", **THUMBNAIL_JPEG_OPTIONS)
         
         end_time = asyncio.get_event_loop().time()
         processing_time = end_time - start_time
         
         # Metadata
         metadata = {
-            "width": request.width,
-            "height": request.height,
+            "width": image.width,
+            "height": image.height,
             "steps": request.num_inference_steps,
             "guidance_scale": request.guidance_scale,
             "seed": request.seed or "random",
             "model": "stable-diffusion-anime",
             "style": request.style,
-            "file_size": output_path.stat().st_size,
+            "file_size": len(png_bytes),
             "format": "PNG"
         }
         
@@ -115,6 +182,20 @@ async def generate_image(
         # Schedule cleanup of temporary files
         background_tasks.add_task(cleanup_temp_files, [])
         
+        if inline:
+            # Persist the copy after the response has been sent
+            background_tasks.add_task(
+                _write_output, output_index, request.output_id, output_path, png_bytes, "image/png"
+            )
+            return Response(
+                content=png_bytes,
+                media_type="image/png",
+                headers={
+                    "X-Output-Id": request.output_id,
+                    "X-Processing-Time": f"{processing_time:.3f}"
+                }
+            )
+        
         return GenerationResponse(
             output_id=request.output_id,
             file_path=str(output_path),
@@ -131,7 +212,8 @@ async def generate_image(
 async def generate_video(
     request: VideoGenerationRequest,
     background_tasks: BackgroundTasks,
-    model_manager: ModelManager = Depends(get_model_manager)
+    model_manager: ModelManager = Depends(get_model_manager),
+    output_index: Dict[str, Tuple[Path, str]] = Depends(get_output_index)
 ):
     """Generate an anime-style video from text prompt"""
     
@@ -173,19 +255,19 @@ async def generate_video(
             audio_track_id=request.audio_track_id
         )
         
+        _index_output(output_index, request.output_id, output_path, "video/mp4")
+        
         # Create thumbnail from first frame
         first_frame = frames[0]
-        thumbnail = first_frame.copy()
-        thumbnail.thumbnail((256, 256), Image.Resampling.LANCZOS)
-        thumbnail.save(thumbnail_path, "JPEG", quality=85)
+        await asyncio.to_thread(_save_thumbnail, first_frame, thumbnail_path)
         
         end_time = asyncio.get_event_loop().time()
         processing_time = end_time - start_time
         
         # Metadata
         metadata = {
-            "width": request.width,
-            "height": request.height,
+            "width": first_frame.width,
+            "height": first_frame.height,
             "frames": num_frames,
             "fps": request.fps,
             "duration": num_frames / request.fps,
@@ -260,23 +342,41 @@ async def get_model_info(
         raise HTTPException(status_code=500, detail="Failed to get model information")
 
 @router.get("/output/{output_id}")
-async def get_output_file(output_id: str):
+async def get_output_file(
+    output_id: str,
+    output_index: Dict[str, Tuple[Path, str]] = Depends(get_output_index)
+):
     """Serve generated output files"""
     
     try:
-        # Try different file extensions
-        for ext in [".png", ".jpg", ".mp4", ".gif"]:
+        indexed = output_index.get(output_id)
+        if indexed:
+            file_path, media_type = indexed
+            
+            # Stat here and hand the result over, so FileResponse doesn't stat the file again
+            try:
+                return FileResponse(file_path, media_type=media_type, stat_result=os.stat(file_path))
+            except FileNotFoundError:
+                # Deleted since it was indexed; drop the stale entry and probe below
+                output_index.pop(output_id, None)
+        
+        # Fall back to probing extensions for files written outside this process
+        for ext, media_type in OUTPUT_MEDIA_TYPES.items():
             file_path = Path(settings.OUTPUT_DIR) / f"{output_id}{ext}"
-            if file_path.exists():
-                media_type = "image/png" if ext == ".png" else \
-                           "image/jpeg" if ext in [".jpg", ".jpeg"] else \
-                           "video/mp4" if ext == ".mp4" else \
-                           "image/gif" if ext == ".gif" else "application/octet-stream"
-                
-                return FileResponse(file_path, media_type=media_type)
+            
+            # One stat per candidate, reused by FileResponse instead of stat-ing again
+            try:
+                stat_result = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            
+            _index_output(output_index, output_id, file_path, media_type)
+            return FileResponse(file_path, media_type=media_type, stat_result=stat_result)
         
         raise HTTPException(status_code=404, detail="Output file not found")
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to serve output file: {e}")
         raise HTTPException(status_code=500, detail="Failed to serve file")
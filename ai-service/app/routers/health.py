@@ -9,6 +9,19 @@ from ..utils.logger import setup_logger
 logger = setup_logger(__name__)
 router = APIRouter()
 
+# Prime psutil so later non-blocking calls report usage since the previous call
+psutil.cpu_percent(interval=None)
+
+# Total GPU memory never changes, so query the device properties once
+_gpu_properties = None
+
+def _get_gpu_properties():
+    """Get cached properties of the first CUDA device"""
+    global _gpu_properties
+    if _gpu_properties is None:
+        _gpu_properties = torch.cuda.get_device_properties(0)
+    return _gpu_properties
+
 @router.get("/")
 async def health_check():
     """Basic health check endpoint"""
@@ -27,7 +40,7 @@ async def detailed_health_check(request: Request):
         model_manager = getattr(request.app.state, 'model_manager', None)
         
         # System information
-        cpu_percent = psutil.cpu_percent(interval=1)
+        cpu_percent = psutil.cpu_percent(None)  # Non-blocking: compares against the previous call
         memory = psutil.virtual_memory()
         disk = psutil.disk_usage('/')
         
@@ -41,7 +54,7 @@ async def detailed_health_check(request: Request):
                 "device_name": torch.cuda.get_device_name(),
                 "memory_allocated": torch.cuda.memory_allocated() / 1024**3,  # GB
                 "memory_reserved": torch.cuda.memory_reserved() / 1024**3,   # GB
-                "memory_total": torch.cuda.get_device_properties(0).total_memory / 1024**3  # GB
+                "memory_total": _get_gpu_properties().total_memory / 1024**3  # GB
             }
         else:
             gpu_info = {"available": False}
@@ -0,0 +1,123 @@
+import os
+import threading
+
+import numpy as np
+
+from ..utils.logger import setup_logger
+
+try:
+    import numba
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+if njit is not None and "NUMBA_THREADING_LAYER" not in os.environ:
+    # The kernels run on worker threads: the default workqueue layer is not threadsafe, and
+    # TBB can hang interpreter exit when a worker thread starts its pool, so use OpenMP
+    numba.config.THREADING_LAYER = "omp"
+
+logger = setup_logger(__name__)
+
+# Upper bound on float32 scratch used by the NumPy batch-blend fallback
+BLEND_CHUNK_BYTES = 64 * 1024 * 1024
+
+# Each call already uses every core, so concurrent callers take turns instead of racing the pool
+_kernel_lock = threading.Lock()
+
+def _blend_flat(a: np.ndarray, b: np.ndarray, t: float, out: np.ndarray) -> np.ndarray:
+    """out = a + t * (b - a) over flat uint8 buffers in a single fused pass"""
+    for i in prange(a.shape[0]):
+        out[i] = np.uint8(a[i] + t * (np.float32(b[i]) - np.float32(a[i])))
+    return out
+
+def _blend_batch_flat(a: np.ndarray, b: np.ndarray, ts: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """out[k] = a + ts[k] * (b - a) for every weight, one frame at a time so writes stay sequential"""
+    for k in range(ts.shape[0]):
+        t = ts[k]
+        frame = out[k]
+        for i in prange(a.shape[0]):
+            frame[i] = np.uint8(a[i] + t * (np.float32(b[i]) - np.float32(a[i])))
+    return out
+
+def _scale_flat(a: np.ndarray, alpha: float, out: np.ndarray) -> np.ndarray:
+    """out = a * alpha over flat uint8 buffers in a single fused pass"""
+    for i in prange(a.shape[0]):
+        out[i] = np.uint8(a[i] * alpha)
+    return out
+
+def _blend_flat_numpy(a: np.ndarray, b: np.ndarray, t: float, out: np.ndarray) -> np.ndarray:
+    """NumPy fallback for _blend_flat using an int16 difference instead of float64 frames"""
+    a16 = a.astype(np.int16)
+    np.copyto(out, a16 + (np.float32(t) * (b.astype(np.int16) - a16)).astype(np.int16), casting="unsafe")
+    return out
+
+def _blend_batch_flat_numpy(a: np.ndarray, b: np.ndarray, ts: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """NumPy fallback for _blend_batch_flat, broadcasting the weights over frame chunks"""
+    a16 = a.astype(np.int16)
+    delta = b.astype(np.int16) - a16
+    chunk_frames = max(1, BLEND_CHUNK_BYTES // (4 * a.shape[0]))
+    for start in range(0, ts.shape[0], chunk_frames):
+        weights = ts[start:start + chunk_frames, None]
+        blended = weights * delta
+        blended += a16
+        np.copyto(out[start:start + chunk_frames], blended, casting="unsafe")
+    return out
+
+def _scale_flat_numpy(a: np.ndarray, alpha: float, out: np.ndarray) -> np.ndarray:
+    """NumPy fallback for _scale_flat"""
+    np.multiply(a, np.float32(alpha), out=out, casting="unsafe")
+    return out
+
+# Compile the per-pixel loops to parallel native code when numba is available
+if njit is not None:
+    _blend_kernel = njit(parallel=True, fastmath=True, cache=True)(_blend_flat)
+    _blend_batch_kernel = njit(parallel=True, fastmath=True, cache=True)(_blend_batch_flat)
+    _scale_kernel = njit(parallel=True, fastmath=True, cache=True)(_scale_flat)
+else:
+    _blend_kernel = _blend_flat_numpy
+    _blend_batch_kernel = _blend_batch_flat_numpy
+    _scale_kernel = _scale_flat_numpy
+
+def blend_uint8(a: np.ndarray, b: np.ndarray, t: float, out: np.ndarray) -> np.ndarray:
+    """Blend two same-shape contiguous uint8 images as (1 - t) * a + t * b into out"""
+    if a.shape != b.shape or a.shape != out.shape:
+        raise ValueError(f"Cannot blend images of shapes {a.shape} and {b.shape} into {out.shape}")
+    with _kernel_lock:
+        _blend_kernel(a.reshape(-1), b.reshape(-1), np.float32(t), out.reshape(-1))
+    return out
+
+def blend_uint8_batch(a: np.ndarray, b: np.ndarray, ts: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """Blend a and b at every weight in ts into out of shape (len(ts),) + a.shape"""
+    if a.shape != b.shape or out.shape != (len(ts),) + a.shape:
+        raise ValueError(f"Cannot blend {len(ts)} frames of shapes {a.shape} and {b.shape} into {out.shape}")
+    with _kernel_lock:
+        _blend_batch_kernel(
+            a.reshape(-1), b.reshape(-1), np.asarray(ts, dtype=np.float32), out.reshape(len(ts), -1)
+        )
+    return out
+
+def scale_uint8(a: np.ndarray, alpha: float, out: np.ndarray) -> np.ndarray:
+    """Scale a contiguous uint8 image by alpha into out"""
+    if a.shape != out.shape:
+        raise ValueError(f"Cannot scale an image of shape {a.shape} into {out.shape}")
+    with _kernel_lock:
+        _scale_kernel(a.reshape(-1), np.float32(alpha), out.reshape(-1))
+    return out
+
+def warmup_kernels():
+    """Compile (or load from cache) the numba kernels so the first request doesn't pay for it"""
+
+    if njit is None:
+        logger.info("numba not available; video blending uses NumPy kernels")
+        return
+
+    try:
+        a = np.zeros((2, 2, 3), dtype=np.uint8)
+        out = np.empty_like(a)
+        blend_uint8(a, a, 0.5, out)
+        blend_uint8_batch(a, a, np.array([0.0, 1.0], dtype=np.float32), np.empty((2,) + a.shape, dtype=np.uint8))
+        scale_uint8(a, 0.5, out)
+        logger.info("Video blending kernels compiled")
+    except Exception as e:
+        logger.warning(f"Failed to compile video blending kernels: {e}")
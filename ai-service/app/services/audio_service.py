@@ -1,27 +1,176 @@
 import os
+import math
+import functools
+import itertools
+import uuid
+from fractions import Fraction
 import numpy as np
 import librosa
 import soundfile as sf
+from scipy.signal import butter, lfilter, oaconvolve, resample_poly
 from typing import List, Optional, Dict, Any, Tuple
 from pathlib import Path
 import asyncio
 import logging
-from pydub import AudioSegment
-from pydub.generators import Sine, Square, Sawtooth, Triangle
 import random
 import json
 
-from ..utils.config import settings
+from ..utils.config import settings, ensure_dir
 from ..utils.logger import setup_logger
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None
+
+try:
+    import soxr  # Installed alongside librosa
+except ImportError:
+    soxr = None
+
 logger = setup_logger(__name__)
 
+def _biquad_df2t(
+    audio: np.ndarray,
+    b0: float,
+    b1: float,
+    b2: float,
+    a1: float,
+    a2: float,
+    out: np.ndarray
+) -> np.ndarray:
+    """Second-order IIR section in transposed direct form II (out may be audio itself)"""
+    z1 = 0.0
+    z2 = 0.0
+    for i in range(len(audio)):
+        x = audio[i]
+        y = b0 * x + z1
+        z1 = b1 * x - a1 * y + z2
+        z2 = b2 * x - a2 * y
+        out[i] = y
+    return out
+
+# Compile the biquad to native code when numba is available; otherwise scipy's lfilter runs it
+_biquad_kernel = njit(cache=True, fastmath=True)(_biquad_df2t) if njit else None
+
+def _chord_recurrence(freqs: np.ndarray, sample_rate: int, out: np.ndarray) -> np.ndarray:
+    """Mean of sin(2*pi*f*n/sample_rate) over freqs via s[n] = 2cos(w)*s[n-1] - s[n-2]"""
+    num_voices = len(freqs)
+    coeffs = np.empty(num_voices)
+    prev = np.empty(num_voices)
+    curr = np.zeros(num_voices)
+    for v in range(num_voices):
+        w = 2 * math.pi * freqs[v] / sample_rate
+        coeffs[v] = 2 * math.cos(w)
+        prev[v] = -math.sin(w)  # s[-1], so that s[0] = 0
+    for n in range(len(out)):
+        acc = 0.0
+        for v in range(num_voices):
+            acc += curr[v]
+            nxt = coeffs[v] * curr[v] - prev[v]
+            prev[v] = curr[v]
+            curr[v] = nxt
+        out[n] = acc / num_voices
+    return out
+
+# Only worth it compiled; without numba the harmony falls back to np.sin
+_chord_kernel = njit(cache=True, fastmath=True)(_chord_recurrence) if njit else None
+
+@functools.lru_cache(maxsize=32)
+def _butter_lowpass(cutoff_freq: float, sample_rate: int) -> Tuple[float, float, float, float, float]:
+    """Second-order Butterworth low-pass coefficients (b0, b1, b2, a1, a2)"""
+    
+    b, a = butter(2, cutoff_freq, btype="low", fs=sample_rate)
+    return float(b[0]), float(b[1]), float(b[2]), float(a[1]), float(a[2])
+
+# Note lengths are rounded to this many samples so cached envelopes get reused
+NOTE_QUANTUM_SAMPLES = 256
+
+@functools.lru_cache(maxsize=256)
+def _create_adsr_envelope(
+    length: int,
+    attack: float,
+    decay: float,
+    sustain: float,
+    release: float
+) -> np.ndarray:
+    """Create ADSR envelope for notes (cached and read-only; do not modify)"""
+    
+    envelope = np.ones(length, dtype=np.float32)
+    attack_samples = int(attack * length)
+    decay_samples = int(decay * length)
+    release_samples = int(release * length)
+    
+    # Attack
+    if attack_samples > 0:
+        envelope[:attack_samples] = np.linspace(0, 1, attack_samples, dtype=np.float32)
+    
+    # Decay
+    if decay_samples > 0:
+        decay_start = attack_samples
+        decay_end = attack_samples + decay_samples
+        envelope[decay_start:decay_end] = np.linspace(1, sustain, decay_samples, dtype=np.float32)
+    
+    # Sustain (already set to sustain level)
+    sustain_start = attack_samples + decay_samples
+    sustain_end = length - release_samples
+    if sustain_end > sustain_start:
+        envelope[sustain_start:sustain_end] = sustain
+    
+    # Release
+    if release_samples > 0:
+        release_start = length - release_samples
+        envelope[release_start:] = np.linspace(sustain, 0, release_samples, dtype=np.float32)
+    
+    envelope.setflags(write=False)
+    return envelope
+
+@functools.lru_cache(maxsize=32)
+def _reverb_impulse_response(delay_samples: int, decay: float, wet: float) -> np.ndarray:
+    """Impulse response of the dry signal plus five decaying echoes (cached; do not modify)"""
+    
+    impulse_response = np.zeros(5 * delay_samples + 1, dtype=np.float32)
+    impulse_response[0] = 1.0
+    for i in range(5):  # Multiple delays for reverb effect
+        impulse_response[(i + 1) * delay_samples] = wet * decay ** (i + 1)
+    
+    impulse_response.setflags(write=False)
+    return impulse_response
+
+def _peak_amplitude(audio: np.ndarray) -> float:
+    """Largest absolute sample value, computed without an abs() temporary"""
+    
+    if len(audio) == 0:
+        return 0.0
+    if ne is not None:
+        return float(ne.evaluate("max(abs(audio))"))
+    return float(max(audio.max(), -audio.min()))
+
+def warmup_audio_kernels():
+    """Compile (or load from cache) the numba audio kernels so the first music request doesn't pay for it"""
+    
+    if njit is None:
+        return
+    
+    try:
+        audio = np.zeros(16, dtype=np.float32)
+        _biquad_kernel(audio, *_butter_lowpass(8000.0, 44100), np.empty_like(audio))
+        _chord_kernel(np.array([440.0, 550.0], dtype=np.float32), 44100, audio)
+        logger.info("Audio synthesis kernels compiled")
+    except Exception as e:
+        logger.warning(f"Failed to compile audio synthesis kernels: {e}")
+
 class AudioService:
     def __init__(self):
         self.sample_rate = 44100
         self.output_dir = Path(settings.OUTPUT_DIR)
         self.audio_dir = Path("audio")
-        self.audio_dir.mkdir(exist_ok=True)
+        ensure_dir(str(self.audio_dir))
         
         # Musical scales and progressions
         self.scales = {
@@ -39,6 +188,20 @@ class AudioService:
             "upbeat": ["I", "IV", "V", "V"],
             "mysterious": ["i", "bVII", "bVI", "bVII"]
         }
+        
+        # Drum one-shots keyed by eighth-note length in samples (i.e. by tempo)
+        self._drum_cache: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        
+        # Output filenames: a per-instance prefix plus a counter, so names never collide
+        # and the NumPy global RNG state is left alone
+        self._file_prefix = uuid.uuid4().hex[:8]
+        self._file_counter = itertools.count()
+        
+        # Noise source for drums and effects (PCG64, generates float32 directly)
+        self._rng = np.random.default_rng()
+        
+        # Shared float32 time axis (seconds); oscillators slice views of it
+        self._t = np.zeros(0, dtype=np.float32)
 
     async def generate_background_music(
         self,
@@ -53,10 +216,23 @@ class AudioService:
         try:
             logger.info(f"Generating {style} music for {duration}s at {tempo} BPM")
             
-            # Generate melody and harmony
-            melody = await self._generate_melody(style, duration, tempo, key, mood)
-            harmony = await self._generate_harmony(style, duration, tempo, key)
-            rhythm = await self._generate_rhythm(style, duration, tempo)
+            # Pitch tables depend only on (key, style), so build them once per track
+            scale = self.scales.get(style, self.scales["major"])
+            scale_freqs = self._note_to_frequency(key + "4") * 2 ** (np.array(scale) / 12)
+            
+            progression = self.chord_progressions.get(style, self.chord_progressions["pop"])
+            bass_freq = self._note_to_frequency(key + "3")  # Lower octave for bass
+            chord_freq_table = {
+                symbol: np.array(self._get_chord_frequencies(symbol, bass_freq), dtype=np.float32)
+                for symbol in set(progression)
+            }
+            
+            # Generate melody, harmony and rhythm concurrently (NumPy releases the GIL)
+            melody, harmony, rhythm = await asyncio.gather(
+                asyncio.to_thread(self._generate_melody, scale_freqs, duration, tempo, mood),
+                asyncio.to_thread(self._generate_harmony, progression, chord_freq_table, duration, tempo),
+                asyncio.to_thread(self._generate_rhythm, style, duration, tempo)
+            )
             
             # Mix the components
             mixed_audio = self._mix_audio_components(melody, harmony, rhythm)
@@ -65,8 +241,8 @@ class AudioService:
             processed_audio = await self._apply_audio_effects(mixed_audio, mood)
             
             # Save the generated audio
-            output_path = self.audio_dir / f"generated_{np.random.randint(1000, 9999)}.wav"
-            sf.write(str(output_path), processed_audio, self.sample_rate)
+            output_path = self.audio_dir / f"generated_{self._file_prefix}_{next(self._file_counter):06d}.wav"
+            sf.write(str(output_path), processed_audio.astype(np.float32, copy=False), self.sample_rate, subtype="FLOAT")
             
             logger.info(f"Generated music saved: {output_path}")
             return str(output_path)
@@ -75,25 +251,20 @@ class AudioService:
             logger.error(f"Failed to generate background music: {e}")
             raise
 
-    async def _generate_melody(
+    def _generate_melody(
         self,
-        style: str,
+        scale_freqs: np.ndarray,
         duration: float,
         tempo: int,
-        key: str,
         mood: str
     ) -> np.ndarray:
-        """Generate melody line"""
+        """Generate melody line from the track's scale frequencies"""
         
         # Calculate parameters
         samples = int(duration * self.sample_rate)
         beat_duration = 60.0 / tempo
         note_duration = beat_duration / 2  # Eighth notes
         
-        # Get scale notes
-        scale = self.scales.get(style, self.scales["major"])
-        base_freq = self._note_to_frequency(key + "4")
-        
         # Generate note sequence
         melody_notes = []
         current_time = 0
@@ -101,17 +272,16 @@ class AudioService:
         while current_time < duration:
             # Choose note from scale
             if mood == "happy":
-                note_choices = scale[:5]  # Higher notes
-                octave_mod = random.choice([0, 1])
+                note_choices = scale_freqs[:5]  # Higher notes
+                octave_factor = random.choice([1.0, 2.0])
             elif mood == "sad":
-                note_choices = scale[2:]  # Lower notes
-                octave_mod = random.choice([-1, 0])
+                note_choices = scale_freqs[2:]  # Lower notes
+                octave_factor = random.choice([0.5, 1.0])
             else:
-                note_choices = scale
-                octave_mod = random.choice([-1, 0, 1])
+                note_choices = scale_freqs
+                octave_factor = random.choice([0.5, 1.0, 2.0])
             
-            note_index = random.choice(note_choices)
-            freq = base_freq * (2 ** (note_index / 12)) * (2 ** octave_mod)
+            freq = random.choice(note_choices) * octave_factor
             
             # Note duration with some variation
             note_len = note_duration * random.uniform(0.5, 2.0)
@@ -119,78 +289,75 @@ class AudioService:
             current_time += note_len
         
         # Generate audio from notes
-        melody_audio = np.zeros(samples)
-        sample_pos = 0
-        
-        for freq, note_len in melody_notes:
-            note_samples = int(note_len * self.sample_rate)
-            if sample_pos + note_samples > samples:
-                note_samples = samples - sample_pos
-            
-            # Generate note with envelope
-            t = np.linspace(0, note_len, note_samples)
-            note_wave = np.sin(2 * np.pi * freq * t)
-            
-            # ADSR envelope
-            envelope = self._create_adsr_envelope(note_samples, 0.1, 0.2, 0.6, 0.3)
-            note_wave *= envelope
-            
-            melody_audio[sample_pos:sample_pos + note_samples] = note_wave
-            sample_pos += note_samples
-            
-            if sample_pos >= samples:
-                break
+        melody_audio = np.zeros(samples, dtype=np.float32)
+        if not melody_notes or samples == 0:
+            return melody_audio
+        
+        # Note frequencies and lengths as flat arrays (lengths quantized for envelope reuse)
+        freqs = np.array([freq for freq, _ in melody_notes])
+        lens = np.array([
+            NOTE_QUANTUM_SAMPLES * max(1, round(int(note_len * self.sample_rate) / NOTE_QUANTUM_SAMPLES))
+            for _, note_len in melody_notes
+        ], dtype=np.int64)
+        
+        # Drop notes past the end of the track and trim the one that crosses it
+        ends = np.cumsum(lens)
+        num_notes = min(int(np.searchsorted(ends, samples)) + 1, len(lens))
+        freqs, lens = freqs[:num_notes], lens[:num_notes]
+        lens[-1] -= max(0, ends[num_notes - 1] - samples)
+        
+        # One sin over the whole timeline from the accumulated per-sample phase
+        # (phase is accumulated in float64; float32 would drift over long tracks)
+        phase = np.cumsum(np.repeat(2 * np.pi * freqs / self.sample_rate, lens))
+        melody_wave = np.sin(phase, out=melody_audio[:len(phase)])
+        
+        # ADSR envelope per note, concatenated from the cached envelopes
+        envelope = np.concatenate([
+            _create_adsr_envelope(int(note_samples), 0.1, 0.2, 0.6, 0.3)
+            for note_samples in lens
+        ])
+        np.multiply(melody_wave, envelope, out=melody_wave)
         
         return melody_audio * 0.3  # Reduce volume
 
-    async def _generate_harmony(
+    def _generate_harmony(
         self,
-        style: str,
+        progression: List[str],
+        chord_freq_table: Dict[str, np.ndarray],
         duration: float,
-        tempo: int,
-        key: str
+        tempo: int
     ) -> np.ndarray:
-        """Generate harmony/chord progression"""
+        """Generate harmony/chord progression from precomputed chord frequencies"""
         
         samples = int(duration * self.sample_rate)
         chord_duration = 60.0 / tempo * 4  # Whole notes
+        chord_stride = max(1, int(chord_duration * self.sample_rate))
         
-        # Get chord progression
-        progression = self.chord_progressions.get(style, self.chord_progressions["pop"])
-        base_freq = self._note_to_frequency(key + "3")  # Lower octave for bass
-        
-        harmony_audio = np.zeros(samples)
-        current_time = 0
+        harmony_audio = np.zeros(samples, dtype=np.float32)
+        start_sample = 0
         chord_index = 0
         
-        while current_time < duration:
+        while start_sample < samples:
             # Get current chord
             chord_symbol = progression[chord_index % len(progression)]
-            chord_freqs = self._get_chord_frequencies(chord_symbol, base_freq)
-            
-            # Generate chord
-            chord_samples = int(min(chord_duration, duration - current_time) * self.sample_rate)
-            t = np.linspace(0, chord_samples / self.sample_rate, chord_samples)
+            chord_freqs = chord_freq_table[chord_symbol]
             
-            chord_wave = np.zeros(chord_samples)
-            for freq in chord_freqs:
-                chord_wave += np.sin(2 * np.pi * freq * t) / len(chord_freqs)
+            # Generate chord directly into its slot of the harmony track
+            chord_samples = min(chord_stride, samples - start_sample)
+            chord_slot = harmony_audio[start_sample:start_sample + chord_samples]
             
-            # Add to harmony
-            start_sample = int(current_time * self.sample_rate)
-            end_sample = start_sample + chord_samples
-            if end_sample > samples:
-                chord_samples = samples - start_sample
-                chord_wave = chord_wave[:chord_samples]
-            
-            harmony_audio[start_sample:start_sample + chord_samples] = chord_wave
+            if _chord_kernel is not None:
+                _chord_kernel(chord_freqs, self.sample_rate, chord_slot)
+            else:
+                t = self._time_axis(chord_samples)
+                chord_slot[:] = np.sin(2 * np.pi * chord_freqs[:, None] * t).mean(axis=0)
             
-            current_time += chord_duration
+            start_sample += chord_stride
             chord_index += 1
         
         return harmony_audio * 0.2  # Reduce volume
 
-    async def _generate_rhythm(
+    def _generate_rhythm(
         self,
         style: str,
         duration: float,
@@ -200,54 +367,64 @@ class AudioService:
         
         samples = int(duration * self.sample_rate)
         beat_duration = 60.0 / tempo
-        
-        rhythm_audio = np.zeros(samples)
-        current_time = 0
+        beat_samples = int(beat_duration / 2 * self.sample_rate)  # Eighth note
         
         # Simple drum pattern
-        kick_pattern = [1, 0, 0, 0, 1, 0, 0, 0]  # Kick on 1 and 5
-        snare_pattern = [0, 0, 1, 0, 0, 0, 1, 0]  # Snare on 3 and 7
-        hihat_pattern = [1, 1, 1, 1, 1, 1, 1, 1]  # Hi-hat on every beat
+        kick_pattern = np.array([1, 0, 0, 0, 1, 0, 0, 0], dtype=np.float32)  # Kick on 1 and 5
+        snare_pattern = np.array([0, 0, 1, 0, 0, 0, 1, 0], dtype=np.float32)  # Snare on 3 and 7
+        hihat_pattern = np.array([1, 1, 1, 1, 1, 1, 1, 1], dtype=np.float32)  # Hi-hat on every beat
         
-        beat_index = 0
+        if samples == 0 or beat_samples == 0:
+            return np.zeros(samples, dtype=np.float32)
         
-        while current_time < duration:
-            # Generate drum sounds
-            beat_samples = int(beat_duration / 2 * self.sample_rate)  # Eighth note
-            
-            drum_wave = np.zeros(beat_samples)
-            
-            # Kick drum (low frequency)
-            if kick_pattern[beat_index % len(kick_pattern)]:
-                t = np.linspace(0, beat_duration / 2, beat_samples)
-                kick = np.sin(2 * np.pi * 60 * t) * np.exp(-t * 20)
-                drum_wave += kick * 0.8
-            
-            # Snare drum (noise burst)
-            if snare_pattern[beat_index % len(snare_pattern)]:
-                snare = np.random.normal(0, 0.1, beat_samples) * np.exp(-np.linspace(0, 5, beat_samples))
-                drum_wave += snare * 0.5
-            
-            # Hi-hat (high frequency)
-            if hihat_pattern[beat_index % len(hihat_pattern)]:
-                t = np.linspace(0, beat_duration / 2, beat_samples)
-                hihat = np.random.normal(0, 0.05, beat_samples) * np.exp(-t * 30)
-                drum_wave += hihat * 0.3
-            
-            # Add to rhythm track
-            start_sample = int(current_time * self.sample_rate)
-            end_sample = start_sample + beat_samples
-            if end_sample > samples:
-                beat_samples = samples - start_sample
-                drum_wave = drum_wave[:beat_samples]
-            
-            rhythm_audio[start_sample:start_sample + beat_samples] = drum_wave
-            
-            current_time += beat_duration / 2
-            beat_index += 1
+        kick, snare, hihat = self._get_drum_one_shots(beat_samples)
+        
+        # Render one bar (beats x samples) from the patterns, then repeat it over the track
+        bar = (
+            np.outer(kick_pattern * 0.8, kick) +
+            np.outer(snare_pattern * 0.5, snare) +
+            np.outer(hihat_pattern * 0.3, hihat)
+        ).ravel()
+        
+        num_bars = -(-samples // len(bar))
+        rhythm_audio = np.tile(bar, num_bars)[:samples]
         
         return rhythm_audio * 0.4
 
+    def _get_drum_one_shots(self, beat_samples: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get kick, snare and hi-hat one-shots for an eighth note of beat_samples"""
+        
+        one_shots = self._drum_cache.get(beat_samples)
+        if one_shots is not None:
+            return one_shots
+        
+        t = self._time_axis(beat_samples)
+        
+        # Kick drum (low frequency)
+        kick = np.sin(2 * np.pi * 60 * t) * np.exp(-t * 20)
+        
+        # Snare drum (noise burst)
+        snare_noise = 0.1 * self._rng.standard_normal(beat_samples, dtype=np.float32)
+        snare = snare_noise * np.exp(-np.linspace(0, 5, beat_samples, dtype=np.float32))
+        
+        # Hi-hat (high frequency)
+        hihat = 0.05 * self._rng.standard_normal(beat_samples, dtype=np.float32) * np.exp(-t * 30)
+        
+        one_shots = (kick, snare, hihat)
+        self._drum_cache[beat_samples] = one_shots
+        return one_shots
+
+    def _time_axis(self, num_samples: int) -> np.ndarray:
+        """Get a read-only float32 view of the first num_samples sample times in seconds"""
+        
+        # Work on a local reference so concurrent callers never slice a shorter axis
+        t = self._t
+        if num_samples > len(t):
+            t = np.arange(num_samples, dtype=np.float32) / np.float32(self.sample_rate)
+            t.setflags(write=False)
+            self._t = t
+        return t[:num_samples]
+
     def _mix_audio_components(
         self,
         melody: np.ndarray,
@@ -258,16 +435,16 @@ class AudioService:
         
         # Ensure all components have the same length
         min_length = min(len(melody), len(harmony), len(rhythm))
-        mixed = (
-            melody[:min_length] +
-            harmony[:min_length] +
-            rhythm[:min_length]
-        )
+        
+        # Accumulate into one buffer instead of allocating a temporary per addition
+        mixed = np.empty(min_length, dtype=np.float32)
+        np.add(melody[:min_length], harmony[:min_length], out=mixed)
+        np.add(mixed, rhythm[:min_length], out=mixed)
         
         # Normalize to prevent clipping
-        max_amplitude = np.max(np.abs(mixed))
+        max_amplitude = _peak_amplitude(mixed)
         if max_amplitude > 0.95:
-            mixed = mixed / max_amplitude * 0.95
+            np.multiply(mixed, 0.95 / max_amplitude, out=mixed)
         
         return mixed
 
@@ -276,25 +453,25 @@ class AudioService:
         audio: np.ndarray,
         mood: str
     ) -> np.ndarray:
-        """Apply audio effects based on mood"""
+        """Apply audio effects based on mood (filters run in place on audio)"""
         
-        processed = audio.copy()
+        processed = audio
         
         if mood == "mysterious":
             # Add reverb effect
             processed = self._add_reverb(processed, 0.3, 0.5)
             # Add low-pass filter
-            processed = self._low_pass_filter(processed, 8000)
+            self._low_pass_filter(processed, 8000, out=processed)
         
         elif mood == "upbeat":
             # Add compression
-            processed = self._compress_audio(processed, 0.7)
+            self._compress_audio(processed, 0.7, out=processed)
             # Slight high-frequency boost
-            processed = self._high_pass_filter(processed, 100)
+            self._high_pass_filter(processed, 100, out=processed)
         
         elif mood == "peaceful":
             # Soft low-pass filter
-            processed = self._low_pass_filter(processed, 6000)
+            self._low_pass_filter(processed, 6000, out=processed)
             # Add gentle reverb
             processed = self._add_reverb(processed, 0.2, 0.3)
         
@@ -306,44 +483,6 @@ class AudioService:
         
         return processed
 
-    def _create_adsr_envelope(
-        self,
-        length: int,
-        attack: float,
-        decay: float,
-        sustain: float,
-        release: float
-    ) -> np.ndarray:
-        """Create ADSR envelope for notes"""
-        
-        envelope = np.ones(length)
-        attack_samples = int(attack * length)
-        decay_samples = int(decay * length)
-        release_samples = int(release * length)
-        
-        # Attack
-        if attack_samples > 0:
-            envelope[:attack_samples] = np.linspace(0, 1, attack_samples)
-        
-        # Decay
-        if decay_samples > 0:
-            decay_start = attack_samples
-            decay_end = attack_samples + decay_samples
-            envelope[decay_start:decay_end] = np.linspace(1, sustain, decay_samples)
-        
-        # Sustain (already set to sustain level)
-        sustain_start = attack_samples + decay_samples
-        sustain_end = length - release_samples
-        if sustain_end > sustain_start:
-            envelope[sustain_start:sustain_end] = sustain
-        
-        # Release
-        if release_samples > 0:
-            release_start = length - release_samples
-            envelope[release_start:] = np.linspace(sustain, 0, release_samples)
-        
-        return envelope
-
     def _note_to_frequency(self, note: str) -> float:
         """Convert note name to frequency"""
         
@@ -363,7 +502,7 @@ class AudioService:
         
         # Calculate frequency
         semitones_from_a4 = (octave - 4) * 12 + notes[note_name] - 9
-        frequency = 440.0 * (2 ** (semitones_from_a4 / 12))
+        frequency = 440.0 * math.pow(2, semitones_from_a4 / 12)
         
         return frequency
 
@@ -387,83 +526,94 @@ class AudioService:
         }
         
         root_offset = roman_to_semitones.get(chord_symbol, 0)
-        root_freq = base_freq * (2 ** (root_offset / 12))
+        root_freq = base_freq * math.pow(2, root_offset / 12)
         
-        chord_freqs = []
-        for interval in intervals:
-            freq = root_freq * (2 ** (interval / 12))
-            chord_freqs.append(freq)
-        
-        return chord_freqs
+        return [root_freq * math.pow(2, interval / 12) for interval in intervals]
 
     def _add_reverb(self, audio: np.ndarray, decay: float, wet: float) -> np.ndarray:
         """Add simple reverb effect"""
         
-        # Simple delay-based reverb
+        # Simple delay-based reverb as a single convolution with a sparse echo response
         delay_samples = int(0.05 * self.sample_rate)  # 50ms delay
-        reverb_audio = audio.copy()
-        
-        for i in range(5):  # Multiple delays for reverb effect
-            delay = delay_samples * (i + 1)
-            if delay < len(audio):
-                delayed = np.zeros_like(audio)
-                delayed[delay:] = audio[:-delay] * (decay ** (i + 1))
-                reverb_audio += delayed
+        impulse_response = _reverb_impulse_response(delay_samples, decay, wet)
         
-        # Mix dry and wet signals
-        return audio * (1 - wet) + reverb_audio * wet
+        return oaconvolve(audio, impulse_response, mode="full")[:len(audio)]
 
-    def _low_pass_filter(self, audio: np.ndarray, cutoff_freq: float) -> np.ndarray:
-        """Apply simple low-pass filter"""
-        
-        # Simple RC low-pass filter approximation
-        alpha = cutoff_freq / (cutoff_freq + self.sample_rate / (2 * np.pi))
-        filtered = np.zeros_like(audio)
-        filtered[0] = audio[0]
+    def _low_pass_filter(
+        self,
+        audio: np.ndarray,
+        cutoff_freq: float,
+        *,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Apply second-order Butterworth low-pass filter (out may be audio itself)"""
         
-        for i in range(1, len(audio)):
-            filtered[i] = alpha * audio[i] + (1 - alpha) * filtered[i - 1]
+        b0, b1, b2, a1, a2 = _butter_lowpass(cutoff_freq, self.sample_rate)
+        if _biquad_kernel is not None:
+            return _biquad_kernel(audio, b0, b1, b2, a1, a2, np.empty_like(audio) if out is None else out)
         
-        return filtered
+        filtered = lfilter((b0, b1, b2), (1.0, a1, a2), audio).astype(audio.dtype, copy=False)
+        if out is None:
+            return filtered
+        out[:] = filtered
+        return out
 
-    def _high_pass_filter(self, audio: np.ndarray, cutoff_freq: float) -> np.ndarray:
-        """Apply simple high-pass filter"""
+    def _high_pass_filter(
+        self,
+        audio: np.ndarray,
+        cutoff_freq: float,
+        *,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Apply simple high-pass filter (out may be audio itself)"""
         
         # High-pass is original minus low-pass
         low_passed = self._low_pass_filter(audio, cutoff_freq)
-        return audio - low_passed * 0.5  # Gentle high-pass effect
+        low_passed *= 0.5  # Gentle high-pass effect
+        return np.subtract(audio, low_passed, out=out)
 
-    def _compress_audio(self, audio: np.ndarray, ratio: float) -> np.ndarray:
-        """Apply simple compression"""
+    def _compress_audio(
+        self,
+        audio: np.ndarray,
+        ratio: float,
+        *,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Apply simple compression (out may be audio itself)"""
         
         threshold = 0.5
-        compressed = audio.copy()
-        
-        # Apply compression to samples above threshold
-        mask = np.abs(compressed) > threshold
-        compressed[mask] = np.sign(compressed[mask]) * (
-            threshold + (np.abs(compressed[mask]) - threshold) / ratio
-        )
         
-        return compressed
+        # Apply compression to samples above threshold in a single branchless pass
+        if ne is not None:
+            return ne.evaluate(
+                "where(a > t, t + (a - t) / r, where(a < -t, (a + t) / r - t, a))",
+                local_dict={"a": audio, "t": audio.dtype.type(threshold), "r": audio.dtype.type(ratio)},
+                out=out
+            )
+        
+        magnitude = np.abs(audio)
+        compressed = np.copysign(threshold + (magnitude - threshold) / ratio, audio)
+        if out is None:
+            out = audio.copy()
+        elif out is not audio:
+            np.copyto(out, audio)
+        np.copyto(out, compressed, where=magnitude > threshold)
+        return out
 
     def _pitch_shift(self, audio: np.ndarray, semitones: float) -> np.ndarray:
         """Simple pitch shifting using resampling"""
         
-        shift_factor = 2 ** (semitones / 12)
+        shift_factor = math.pow(2, semitones / 12)
         
-        # Resample audio
-        new_length = int(len(audio) / shift_factor)
-        indices = np.linspace(0, len(audio) - 1, new_length)
-        shifted = np.interp(indices, np.arange(len(audio)), audio)
+        # Resample audio with a polyphase filter
+        if soxr is not None:
+            shifted = soxr.resample(audio, self.sample_rate, self.sample_rate / shift_factor, quality="QQ")
+        else:
+            ratio = Fraction(1 / shift_factor).limit_denominator(1000)
+            shifted = resample_poly(audio, ratio.numerator, ratio.denominator)
         
         # Pad or trim to original length
-        if len(shifted) < len(audio):
-            padded = np.zeros_like(audio)
-            padded[:len(shifted)] = shifted
-            return padded
-        else:
-            return shifted[:len(audio)]
+        return librosa.util.fix_length(shifted.astype(audio.dtype, copy=False), size=len(audio))
 
     async def create_sound_effects(
         self,
@@ -475,35 +625,38 @@ class AudioService:
         
         try:
             samples = int(duration * self.sample_rate)
-            t = np.linspace(0, duration, samples)
+            t = self._time_axis(samples)
             
             if effect_type == "whoosh":
                 # Wind/whoosh effect
-                frequency = np.linspace(800, 200, samples)
-                audio = np.random.normal(0, 0.1, samples) * np.sin(2 * np.pi * frequency * t)
+                frequency = np.linspace(800, 200, samples, dtype=np.float32)
+                noise = 0.1 * self._rng.standard_normal(samples, dtype=np.float32)
+                audio = noise * np.sin(2 * np.pi * frequency * t)
                 audio *= np.exp(-t * 2)  # Fade out
             
             elif effect_type == "sparkle":
-                # Magical sparkle effect
-                audio = np.zeros(samples)
-                for _ in range(20):  # Multiple sparkles
-                    start = random.randint(0, samples - 1000)
-                    sparkle_duration = random.uniform(0.05, 0.2)
-                    sparkle_samples = int(sparkle_duration * self.sample_rate)
-                    freq = random.uniform(2000, 8000)
-                    
-                    sparkle_t = np.linspace(0, sparkle_duration, sparkle_samples)
-                    sparkle = np.sin(2 * np.pi * freq * sparkle_t) * np.exp(-sparkle_t * 10)
-                    
-                    end = min(start + sparkle_samples, samples)
-                    audio[start:end] += sparkle[:end-start] * 0.3
+                # Magical sparkle effect: all sparkles rendered as one (num_sparkles, max_len) matrix
+                num_sparkles = 20
+                starts = self._rng.integers(0, samples - 1000, num_sparkles, endpoint=True)
+                sparkle_durations = self._rng.uniform(0.05, 0.2, num_sparkles).astype(np.float32)
+                freqs = self._rng.uniform(2000, 8000, num_sparkles).astype(np.float32)
+                
+                max_sparkle_samples = int(0.2 * self.sample_rate)
+                sparkle_t = self._time_axis(max_sparkle_samples)
+                sparkles = np.sin(2 * np.pi * freqs[:, None] * sparkle_t) * np.exp(-sparkle_t * 10)
+                sparkles *= (sparkle_t < sparkle_durations[:, None]) * np.float32(0.3)
+                
+                # Scatter-add into a padded buffer so sparkles running past the end are dropped
+                audio = np.zeros(samples + max_sparkle_samples, dtype=np.float32)
+                np.add.at(audio, starts[:, None] + np.arange(max_sparkle_samples), sparkles)
+                audio = audio[:samples]
             
             elif effect_type == "impact":
                 # Impact/hit effect
-                frequency = np.linspace(100, 50, samples)
+                frequency = np.linspace(100, 50, samples, dtype=np.float32)
                 audio = np.sin(2 * np.pi * frequency * t) * np.exp(-t * 8)
                 # Add noise component
-                audio += np.random.normal(0, 0.2, samples) * np.exp(-t * 15)
+                audio += 0.2 * self._rng.standard_normal(samples, dtype=np.float32) * np.exp(-t * 15)
             
             else:
                 # Default sine wave
@@ -511,11 +664,13 @@ class AudioService:
                 audio = np.sin(2 * np.pi * freq * t) * np.exp(-t * 2)
             
             # Normalize
-            audio = audio / np.max(np.abs(audio)) * 0.8
+            peak = _peak_amplitude(audio)
+            if peak > 0:
+                np.multiply(audio, 0.8 / peak, out=audio)
             
             # Save effect
-            output_path = self.audio_dir / f"effect_{effect_type}_{np.random.randint(1000, 9999)}.wav"
-            sf.write(str(output_path), audio, self.sample_rate)
+            output_path = self.audio_dir / f"effect_{effect_type}_{self._file_prefix}_{next(self._file_counter):06d}.wav"
+            sf.write(str(output_path), audio.astype(np.float32, copy=False), self.sample_rate, subtype="FLOAT")
             
             logger.info(f"Sound effect created: {output_path}")
             return str(output_path)
@@ -1,101 +1,217 @@
 import os
+import ctypes.util
+import functools
+import hashlib
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
-from typing import List, Optional, Tuple
+from typing import AsyncIterator, List, Optional, Tuple, Union
 from pathlib import Path
 import asyncio
 import logging
 from PIL import Image
 import moviepy.editor as mp
-from moviepy.video.io.ImageSequenceClip import ImageSequenceClip
-import tempfile
+from moviepy.config import get_setting
 import shutil
 
-from ..utils.config import settings
+from ..utils.config import settings, ensure_dir
 from ..utils.logger import setup_logger
+from ._kernels import blend_uint8_batch, scale_uint8
 
 logger = setup_logger(__name__)
 
+# Same ffmpeg build moviepy uses (imageio-ffmpeg unless FFMPEG_BINARY is set)
+FFMPEG_BINARY = get_setting("FFMPEG_BINARY")
+
+# Frames buffered between frame generation and the ffmpeg writer
+FRAME_QUEUE_SIZE = 8
+
+# Upper bound on each block of interpolated frames blended at once
+INTERPOLATION_CHUNK_BYTES = 64 * 1024 * 1024
+
+# Upper bound on rendered transition frames kept for reuse within one slideshow
+TRANSITION_CACHE_BYTES = 256 * 1024 * 1024
+
+# Encoder input: a PIL image, or an RGB uint8 array already at the video size
+Frame = Union[Image.Image, np.ndarray]
+
+@functools.lru_cache(maxsize=1)
+def _nvenc_available() -> bool:
+    """Whether to encode with NVENC (per VIDEO_ENCODER, probing the driver and ffmpeg on "auto")"""
+    
+    if settings.VIDEO_ENCODER != "auto":
+        return settings.VIDEO_ENCODER == "nvenc"
+    
+    available = False
+    if ctypes.util.find_library("nvidia-encode"):
+        try:
+            result = subprocess.run(
+                [FFMPEG_BINARY, "-hide_banner", "-encoders"],
+                capture_output=True, text=True, timeout=10
+            )
+            available = "h264_nvenc" in result.stdout
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"Failed to probe ffmpeg encoders: {e}")
+    
+    logger.info(f"Video encoder: {'h264_nvenc' if available else 'libx264'}")
+    return available
+
+def _video_encoder_args(bitrate: Optional[str] = None) -> List[str]:
+    """ffmpeg video codec arguments for the configured encoder"""
+    
+    if _nvenc_available():
+        args = ["-c:v", "h264_nvenc", "-preset", "p4", "-tune", "hq", "-rc", "vbr"]
+    else:
+        args = ["-c:v", "libx264", "-preset", "veryfast"]
+    
+    if bitrate:
+        args += ["-b:v", bitrate]
+    return args
+
 class VideoService:
     def __init__(self):
         self.temp_dir = Path(settings.TEMP_DIR)
         self.output_dir = Path(settings.OUTPUT_DIR)
-        self.temp_dir.mkdir(exist_ok=True)
-        self.output_dir.mkdir(exist_ok=True)
+        ensure_dir(str(self.temp_dir))
+        ensure_dir(str(self.output_dir))
 
     async def create_video_from_frames(
         self,
-        frames: List[Image.Image],
+        frames: List[Frame],
         output_path: Path,
         fps: int = 24,
         audio_track_id: Optional[str] = None,
     ) -> str:
-        """Create video from a list of PIL Images with optional audio"""
+        """Create video from a list of PIL Images (or RGB uint8 arrays) with optional audio"""
         
         try:
             logger.info(f"Creating video with {len(frames)} frames at {fps} FPS")
             
-            # Create temporary directory for this video
-            with tempfile.TemporaryDirectory(dir=self.temp_dir) as temp_video_dir:
-                temp_video_path = Path(temp_video_dir)
-                
-                # Save frames as temporary image files
-                frame_paths = []
-                for i, frame in enumerate(frames):
-                    frame_path = temp_video_path / f"frame_{i:06d}.png"
-                    frame.save(frame_path, "PNG")
-                    frame_paths.append(str(frame_path))
-                
-                # Create video from image sequence
-                video_clip = ImageSequenceClip(frame_paths, fps=fps)
-                
-                # Add audio if specified
-                if audio_track_id:
-                    audio_clip = await self._get_audio_clip(audio_track_id)
-                    if audio_clip:
-                        # Loop or trim audio to match video duration
-                        video_duration = video_clip.duration
-                        if audio_clip.duration < video_duration:
-                            # Loop audio to match video length
-                            loops_needed = int(np.ceil(video_duration / audio_clip.duration))
-                            audio_clip = mp.concatenate_audioclips([audio_clip] * loops_needed)
-                            audio_clip = audio_clip.subclip(0, video_duration)
-                        else:
-                            # Trim audio to match video length
-                            audio_clip = audio_clip.subclip(0, video_duration)
-                        
-                        video_clip = video_clip.set_audio(audio_clip)
-                
-                # Write final video
-                video_clip.write_videofile(
-                    str(output_path),
-                    fps=fps,
-                    codec='libx264',
-                    audio_codec='aac' if audio_track_id else None,
-                    temp_audiofile=str(temp_video_path / 'temp_audio.m4a'),
-                    remove_temp=True,
-                    verbose=False,
-                    logger=None  # Suppress moviepy logging
-                )
-                
-                # Clean up
-                video_clip.close()
-                if audio_track_id and 'audio_clip' in locals():
-                    audio_clip.close()
-                
-                logger.info(f"Video created successfully: {output_path}")
-                return str(output_path)
+            if not frames:
+                raise ValueError("Cannot create a video without frames")
+            
+            # With or without audio, frames go to ffmpeg as raw RGB arrays (no moviepy, no PNG
+            # round-trip); cv2.VideoWriter is avoided because stock OpenCV wheels lack H.264
+            audio_path = await self._get_audio_path(audio_track_id)
+            await self._encode_frame_stream(
+                self._iter_frames(frames), self._frame_size(frames[0]), output_path, fps, audio_path
+            )
+            
+            logger.info(f"Video created successfully: {output_path}")
+            return str(output_path)
                 
         except Exception as e:
             logger.error(f"Failed to create video: {e}")
             raise
 
+    async def _iter_frames(self, frames: List[Frame]) -> AsyncIterator[Frame]:
+        """Adapt a list of frames to the async frame stream the encoder consumes"""
+        for frame in frames:
+            yield frame
+
+    def _frame_size(self, frame: Frame) -> Tuple[int, int]:
+        """(width, height) of a PIL image or image array"""
+        if isinstance(frame, np.ndarray):
+            return frame.shape[1], frame.shape[0]
+        return frame.size
+
+    async def _get_audio_path(self, audio_track_id: Optional[str]) -> Optional[str]:
+        """Resolve an audio track to a file path; ffmpeg loops or trims it to the video length"""
+        
+        if not audio_track_id:
+            return None
+        
+        audio_clip = await self._get_audio_clip(audio_track_id)
+        if not audio_clip:
+            return None
+        
+        audio_path = audio_clip.filename
+        audio_clip.close()
+        return audio_path
+
+    async def _encode_frame_stream(
+        self,
+        frames: AsyncIterator[Frame],
+        size: Tuple[int, int],
+        output_path: Path,
+        fps: int,
+        audio_path: Optional[str] = None
+    ):
+        """Encode a frame stream with ffmpeg through a bounded producer/writer pipeline
+        
+        A producer task pulls frames into a bounded queue, a writer task feeds them to ffmpeg's
+        stdin and a third task drains ffmpeg's stderr, so frame generation overlaps encoding and
+        at most FRAME_QUEUE_SIZE frames are held in memory.
+        """
+        
+        width, height = size
+        cmd = [
+            FFMPEG_BINARY, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-vcodec", "rawvideo",
+            "-s", f"{width}x{height}", "-pix_fmt", "rgb24", "-r", str(fps),
+            "-i", "-",
+        ]
+        if audio_path:
+            # Loop the audio track as needed and stop at the end of the video
+            cmd += ["-stream_loop", "-1", "-i", audio_path, "-c:a", "aac", "-shortest"]
+        cmd += _video_encoder_args() + ["-pix_fmt", "yuv420p", str(output_path)]
+        
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        frame_queue: asyncio.Queue = asyncio.Queue(maxsize=FRAME_QUEUE_SIZE)
+        
+        async def produce():
+            try:
+                async for frame in frames:
+                    await frame_queue.put(frame)
+            finally:
+                await frame_queue.put(None)  # End of stream
+        
+        async def write():
+            pipe_open = True
+            while True:
+                frame = await frame_queue.get()
+                if frame is None:
+                    break
+                if not pipe_open:
+                    continue  # Keep draining so the producer never blocks on a full queue
+                
+                frame = self._to_rgb_array(frame, size)
+                
+                try:
+                    process.stdin.write(memoryview(frame).cast("B"))
+                    await process.stdin.drain()
+                except (BrokenPipeError, ConnectionResetError):
+                    pipe_open = False  # ffmpeg exited early; its error output is reported below
+            process.stdin.close()
+        
+        tasks = [asyncio.ensure_future(stage) for stage in (produce(), write(), process.stderr.read())]
+        try:
+            _, _, stderr = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            if process.returncode is None:
+                process.kill()
+            raise
+        finally:
+            await process.wait()
+        
+        if process.returncode != 0:
+            raise RuntimeError(f"ffmpeg exited with code {process.returncode}: {stderr.decode(errors='replace').strip()}")
+
     async def create_interpolated_video(
         self,
         start_frame: Image.Image,
         end_frame: Image.Image,
-        num_frames: int = 30,
         output_path: Path,
+        num_frames: int = 30,
         fps: int = 24,
         interpolation_method: str = "linear"
     ) -> str:
@@ -104,47 +220,52 @@ class VideoService:
         try:
             logger.info(f"Creating interpolated video with {num_frames} frames")
             
-            # Convert PIL images to numpy arrays
-            start_array = np.array(start_frame)
-            end_array = np.array(end_frame)
+            if num_frames < 1:
+                raise ValueError("Cannot create a video without frames")
             
-            # Ensure both images have the same dimensions
-            if start_array.shape != end_array.shape:
-                # Resize end frame to match start frame
-                end_frame_resized = end_frame.resize(start_frame.size, Image.Resampling.LANCZOS)
-                end_array = np.array(end_frame_resized)
+            # Convert both images to RGB arrays of the start frame's size (bilinear is plenty for blend targets)
+            start_array = self._to_rgb_array(start_frame, start_frame.size)
+            end_array = self._to_rgb_array(end_frame, start_frame.size, Image.Resampling.BILINEAR)
             
-            # Generate interpolated frames
-            frames = []
-            for i in range(num_frames):
-                t = i / (num_frames - 1)  # Interpolation factor (0 to 1)
-                
-                if interpolation_method == "linear":
-                    # Linear interpolation
-                    interpolated = (1 - t) * start_array + t * end_array
-                elif interpolation_method == "ease_in_out":
-                    # Ease in-out interpolation
-                    t = self._ease_in_out(t)
-                    interpolated = (1 - t) * start_array + t * end_array
-                elif interpolation_method == "bounce":
-                    # Bounce effect
-                    t = self._bounce_easing(t)
-                    interpolated = (1 - t) * start_array + t * end_array
-                else:
-                    # Default to linear
-                    interpolated = (1 - t) * start_array + t * end_array
-                
-                # Convert back to PIL Image
-                interpolated_frame = Image.fromarray(interpolated.astype(np.uint8))
-                frames.append(interpolated_frame)
+            # Interpolation factors (0 to 1) for all frames, eased in one vectorized call
+            t_values = np.linspace(0, 1, num_frames, dtype=np.float32)
+            if interpolation_method == "ease_in_out":
+                t_values = self._ease_in_out(t_values)
+            elif interpolation_method == "bounce":
+                t_values = self._bounce_easing(t_values)
+            # "linear" and unknown methods use t as-is
             
-            # Create video from interpolated frames
-            return await self.create_video_from_frames(frames, output_path, fps)
+            # Stream interpolated frames into the encoder, blended in memory-capped batches
+            await self._encode_frame_stream(
+                self._iter_interpolated_frames(start_array, end_array, t_values),
+                start_frame.size, output_path, fps
+            )
+            
+            logger.info(f"Interpolated video created successfully: {output_path}")
+            return str(output_path)
             
         except Exception as e:
             logger.error(f"Failed to create interpolated video: {e}")
             raise
 
+    async def _iter_interpolated_frames(
+        self,
+        start_array: np.ndarray,
+        end_array: np.ndarray,
+        t_values: np.ndarray
+    ) -> AsyncIterator[Frame]:
+        """Yield blends of two RGB arrays at each weight, at most INTERPOLATION_CHUNK_BYTES per batch"""
+        
+        frames_per_chunk = max(1, INTERPOLATION_CHUNK_BYTES // start_array.nbytes)
+        for chunk_start in range(0, len(t_values), frames_per_chunk):
+            chunk_t = t_values[chunk_start:chunk_start + frames_per_chunk]
+            
+            # A fresh block per chunk: frames of the previous one may still be queued for ffmpeg
+            block = np.empty((len(chunk_t),) + start_array.shape, dtype=np.uint8)
+            await asyncio.to_thread(blend_uint8_batch, start_array, end_array, chunk_t, block)
+            for frame in block:
+                yield frame
+
     async def add_motion_effects(
         self,
         frames: List[Image.Image],
@@ -156,62 +277,34 @@ class VideoService:
         try:
             logger.info(f"Adding {effect_type} motion effect with intensity {intensity}")
             
-            processed_frames = []
+            # Per-frame effect parameter: zoom scale, pan shift fraction, rotation angle or fade alpha
+            progress = [i / len(frames) for i in range(len(frames))]
+            if effect_type == "zoom":
+                params = [1.0 + intensity * p for p in progress]
+            elif effect_type == "pan":
+                params = [intensity * p for p in progress]
+            elif effect_type == "rotate":
+                params = [intensity * 360 * p for p in progress]
+            elif effect_type == "fade":
+                params = progress
+            else:
+                # No effect, return original frames
+                return list(frames)
             
-            for i, frame in enumerate(frames):
-                frame_array = np.array(frame)
-                h, w = frame_array.shape[:2]
-                
-                if effect_type == "zoom":
-                    # Gradual zoom effect
-                    scale_factor = 1.0 + (intensity * i / len(frames))
-                    new_h, new_w = int(h * scale_factor), int(w * scale_factor)
-                    
-                    # Resize and center crop
-                    resized = cv2.resize(frame_array, (new_w, new_h))
-                    
-                    if scale_factor > 1.0:
-                        # Crop from center
-                        start_y = (new_h - h) // 2
-                        start_x = (new_w - w) // 2
-                        cropped = resized[start_y:start_y+h, start_x:start_x+w]
-                    else:
-                        cropped = resized
-                    
-                    processed_frame = Image.fromarray(cropped)
-                
-                elif effect_type == "pan":
-                    # Pan effect (horizontal movement)
-                    shift_x = int(intensity * w * i / len(frames))
-                    
-                    # Create transformation matrix
-                    M = np.float32([[1, 0, shift_x], [0, 1, 0]])
-                    shifted = cv2.warpAffine(frame_array, M, (w, h))
-                    
-                    processed_frame = Image.fromarray(shifted)
-                
-                elif effect_type == "rotate":
-                    # Gradual rotation effect
-                    angle = intensity * 360 * i / len(frames)
-                    
-                    # Get rotation matrix
-                    center = (w // 2, h // 2)
-                    M = cv2.getRotationMatrix2D(center, angle, 1.0)
-                    rotated = cv2.warpAffine(frame_array, M, (w, h))
-                    
-                    processed_frame = Image.fromarray(rotated)
-                
-                elif effect_type == "fade":
-                    # Fade effect
-                    alpha = i / len(frames)
-                    faded = frame_array * alpha
-                    processed_frame = Image.fromarray(faded.astype(np.uint8))
-                
-                else:
-                    # No effect, return original frame
-                    processed_frame = frame
-                
-                processed_frames.append(processed_frame)
+            if effect_type == "fade":
+                # Memory-bound (and already parallel in the kernel), so threads gain little
+                processed_frames = [
+                    self._apply_motion_effect(frame, effect_type, param)
+                    for frame, param in zip(frames, params)
+                ]
+            else:
+                # cv2 releases the GIL, so frames transform in parallel on a thread pool
+                loop = asyncio.get_running_loop()
+                with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                    processed_frames = await asyncio.gather(*(
+                        loop.run_in_executor(executor, self._apply_motion_effect, frame, effect_type, param)
+                        for frame, param in zip(frames, params)
+                    ))
             
             return processed_frames
             
@@ -219,6 +312,57 @@ class VideoService:
             logger.error(f"Failed to add motion effects: {e}")
             return frames  # Return original frames on error
 
+    def _apply_motion_effect(self, frame: Image.Image, effect_type: str, param: float) -> Image.Image:
+        """Apply one motion effect step to a single frame"""
+        
+        frame_array = np.asarray(frame)
+        h, w = frame_array.shape[:2]
+        
+        if effect_type == "zoom":
+            # Gradual zoom effect
+            scale_factor = param
+            
+            if scale_factor > 1.0:
+                # Resize only the centre region that survives the crop
+                y0 = int(round((h - h / scale_factor) / 2))
+                x0 = int(round((w - w / scale_factor) / 2))
+                zoomed = cv2.resize(
+                    frame_array[y0:h - y0, x0:w - x0], (w, h),
+                    dst=np.empty_like(frame_array), interpolation=cv2.INTER_LINEAR
+                )
+            else:
+                new_h, new_w = int(h * scale_factor), int(w * scale_factor)
+                zoomed = cv2.resize(frame_array, (new_w, new_h))
+            
+            return Image.fromarray(zoomed)
+        
+        if effect_type == "pan":
+            # Pan effect (horizontal movement): a slice copy, zero-filling the uncovered edge
+            shift_x = int(param * w)
+            shifted = np.zeros_like(frame_array)
+            if 0 <= shift_x < w:
+                shifted[:, shift_x:] = frame_array[:, :w - shift_x]
+            elif -w < shift_x < 0:
+                shifted[:, :shift_x] = frame_array[:, -shift_x:]
+            
+            return Image.fromarray(shifted)
+        
+        if effect_type == "rotate":
+            # Gradual rotation effect
+            center = (w // 2, h // 2)
+            M = cv2.getRotationMatrix2D(center, param, 1.0)
+            rotated = cv2.warpAffine(
+                frame_array, M, (w, h), dst=np.empty_like(frame_array), flags=cv2.INTER_LINEAR
+            )
+            
+            return Image.fromarray(rotated)
+        
+        if effect_type == "fade":
+            faded = scale_uint8(frame_array, param, np.empty_like(frame_array))
+            return Image.fromarray(faded)
+        
+        return frame
+
     async def create_slideshow_video(
         self,
         images: List[Image.Image],
@@ -233,66 +377,163 @@ class VideoService:
         try:
             logger.info(f"Creating slideshow with {len(images)} images")
             
-            all_frames = []
+            if not images:
+                raise ValueError("Cannot create a slideshow without images")
+            
             frames_per_image = int(duration_per_image * fps)
             transition_frames = int(transition_duration * fps)
             
-            for i, image in enumerate(images):
-                # Add static frames for current image
-                for _ in range(frames_per_image):
-                    all_frames.append(image)
-                
-                # Add transition frames to next image
-                if i < len(images) - 1:
-                    next_image = images[i + 1]
-                    transition_frames_list = await self._create_transition_frames(
-                        image, next_image, transition_frames
-                    )
-                    all_frames.extend(transition_frames_list)
-            
-            return await self.create_video_from_frames(
-                all_frames, output_path, fps, audio_track_id
+            # Frames are streamed straight into the encoder instead of collected in a list
+            audio_path = await self._get_audio_path(audio_track_id)
+            await self._encode_frame_stream(
+                self._iter_slideshow_frames(images, images[0].size, frames_per_image, transition_frames),
+                images[0].size, output_path, fps, audio_path
             )
             
+            logger.info(f"Slideshow created successfully: {output_path}")
+            return str(output_path)
+            
         except Exception as e:
             logger.error(f"Failed to create slideshow video: {e}")
             raise
 
-    async def _create_transition_frames(
+    def _to_rgb_array(
         self,
-        from_image: Image.Image,
-        to_image: Image.Image,
+        frame: Frame,
+        size: Tuple[int, int],
+        resample: Image.Resampling = Image.Resampling.LANCZOS
+    ) -> np.ndarray:
+        """Convert a frame to a contiguous RGB uint8 array of the given (width, height)
+        
+        RGB frames already at the target size are returned as a no-copy view.
+        """
+        
+        if isinstance(frame, np.ndarray):
+            if frame.dtype != np.uint8:
+                raise ValueError(f"Expected a uint8 frame, got {frame.dtype}")
+            if frame.shape == (size[1], size[0], 3):
+                return np.ascontiguousarray(frame)
+            
+            # Other sizes or channel layouts (grayscale, RGBA) go through the PIL path below
+            frame = Image.fromarray(frame)
+        
+        if frame.mode != "RGB":
+            frame = frame.convert("RGB")
+        if frame.size != size:
+            frame = frame.resize(size, resample)
+        return np.asarray(frame)
+
+    async def _iter_slideshow_frames(
+        self,
+        images: List[Image.Image],
+        size: Tuple[int, int],
+        frames_per_image: int,
+        transition_frames: int
+    ) -> AsyncIterator[Frame]:
+        """Yield slideshow frames, blending each transition in a worker thread"""
+        
+        # Transitions of this slideshow keyed by (from digest, to digest, size, num_frames, transition_type)
+        transition_cache: OrderedDict[tuple, Optional[List[np.ndarray]]] = OrderedDict()
+        
+        # Static frames for each image: convert once, then repeat the same buffer
+        static_frame = self._to_rgb_array(images[0], size)
+        
+        for i in range(len(images)):
+            for _ in range(frames_per_image):
+                yield static_frame
+            
+            # Transition frames to next image, blended from the same arrays the static frames show
+            if i < len(images) - 1:
+                next_frame = self._to_rgb_array(images[i + 1], size)
+                transition_frames_list = await asyncio.to_thread(
+                    self._create_transition_frames, static_frame, next_frame, size, transition_frames,
+                    cache=transition_cache
+                )
+                for frame in transition_frames_list:
+                    yield frame
+                static_frame = next_frame
+
+    def _create_transition_frames(
+        self,
+        from_image: Frame,
+        to_image: Frame,
+        size: Tuple[int, int],
         num_frames: int,
-        transition_type: str = "fade"
-    ) -> List[Image.Image]:
-        """Create transition frames between two images"""
+        transition_type: str = "fade",
+        cache: Optional[OrderedDict] = None
+    ) -> List[np.ndarray]:
+        """Create transition frames between two images (or RGB arrays) as RGB arrays of the given size
         
-        frames = []
-        from_array = np.array(from_image)
-        to_array = np.array(to_image)
+        With a cache, a pair seen for the second time (e.g. in a looping slideshow) is kept,
+        up to TRANSITION_CACHE_BYTES, so further repeats skip rendering. Cached frames are read-only.
+        """
+        
+        from_array = self._to_rgb_array(from_image, size)
+        to_array = self._to_rgb_array(to_image, size)
         
-        # Ensure both images have the same dimensions
-        if from_array.shape != to_array.shape:
-            to_image_resized = to_image.resize(from_image.size, Image.Resampling.LANCZOS)
-            to_array = np.array(to_image_resized)
+        if cache is None:
+            return self._render_transition(from_array, to_array, num_frames, transition_type)
         
+        cache_key = (
+            hashlib.blake2b(memoryview(from_array).cast("B"), digest_size=16).digest(),
+            hashlib.blake2b(memoryview(to_array).cast("B"), digest_size=16).digest(),
+            size, num_frames, transition_type
+        )
+        repeated = cache_key in cache
+        frames = cache.get(cache_key)
+        if frames is not None:
+            cache.move_to_end(cache_key)
+            return frames
+        
+        frames = self._render_transition(from_array, to_array, num_frames, transition_type)
+        
+        sequence_bytes = sum(frame.nbytes for frame in frames)
+        if not repeated or sequence_bytes > TRANSITION_CACHE_BYTES:
+            # First sighting: remember the key only, so pairs that never repeat cost no memory
+            cache[cache_key] = None
+            return frames
+        
+        for frame in frames:
+            frame.setflags(write=False)
+        cache[cache_key] = frames
+        cache.move_to_end(cache_key)
+        
+        # Evict least recently used sequences beyond the byte budget
+        cached_bytes = sum(sum(frame.nbytes for frame in seq) for seq in cache.values() if seq is not None)
+        for key in list(cache):
+            if cached_bytes <= TRANSITION_CACHE_BYTES:
+                break
+            if cache[key] is not None and key != cache_key:
+                cached_bytes -= sum(frame.nbytes for frame in cache[key])
+                cache[key] = None
+        
+        return frames
+
+    def _render_transition(
+        self,
+        from_array: np.ndarray,
+        to_array: np.ndarray,
+        num_frames: int,
+        transition_type: str
+    ) -> List[np.ndarray]:
+        """Render transition frames between two same-shape RGB arrays"""
+        
+        if transition_type != "slide":
+            # Fade transition (also the default): all frames in one batched blend
+            frames = np.empty((num_frames,) + from_array.shape, dtype=np.uint8)
+            t_values = np.linspace(0, 1, num_frames, dtype=np.float32)
+            return list(blend_uint8_batch(from_array, to_array, t_values, frames))
+        
+        frames = []
         for i in range(num_frames):
-            t = i / (num_frames - 1)
-            
-            if transition_type == "fade":
-                # Simple fade transition
-                blended = (1 - t) * from_array + t * to_array
-            elif transition_type == "slide":
-                # Slide transition
-                split_point = int(t * from_array.shape[1])
-                blended = from_array.copy()
-                blended[:, :split_point] = to_array[:, :split_point]
-            else:
-                # Default fade
-                blended = (1 - t) * from_array + t * to_array
+            t = i / max(num_frames - 1, 1)
+            
+            # Slide transition
+            split_point = int(t * from_array.shape[1])
+            blended = from_array.copy()
+            blended[:, :split_point] = to_array[:, :split_point]
             
-            frame = Image.fromarray(blended.astype(np.uint8))
-            frames.append(frame)
+            frames.append(blended)
         
         return frames
 
@@ -318,19 +559,13 @@ class VideoService:
             logger.error(f"Failed to load audio track {audio_track_id}: {e}")
             return None
 
-    def _ease_in_out(self, t: float) -> float:
-        """Ease in-out interpolation function"""
-        if t < 0.5:
-            return 2 * t * t
-        else:
-            return -1 + (4 - 2 * t) * t
+    def _ease_in_out(self, t: np.ndarray) -> np.ndarray:
+        """Ease in-out interpolation function (elementwise)"""
+        return np.where(t < 0.5, 2 * t * t, -1 + (4 - 2 * t) * t)
 
-    def _bounce_easing(self, t: float) -> float:
-        """Bounce easing function"""
-        if t < 0.5:
-            return 2 * t * t
-        else:
-            return 1 - 2 * (1 - t) * (1 - t)
+    def _bounce_easing(self, t: np.ndarray) -> np.ndarray:
+        """Bounce easing function (elementwise)"""
+        return np.where(t < 0.5, 2 * t * t, 1 - 2 * (1 - t) * (1 - t))
 
     async def optimize_video(
         self,
@@ -344,8 +579,6 @@ class VideoService:
         try:
             logger.info(f"Optimizing video: {input_path}")
             
-            video_clip = mp.VideoFileClip(str(input_path))
-            
             # Set quality parameters
             if target_quality == "high":
                 bitrate = "2000k"
@@ -354,19 +587,14 @@ class VideoService:
             else:  # medium
                 bitrate = "1000k"
             
-            # Write optimized video
-            video_clip.write_videofile(
-                str(output_path),
-                bitrate=bitrate,
-                codec='libx264',
-                audio_codec='aac',
-                temp_audiofile=str(output_path.parent / 'temp_audio.m4a'),
-                remove_temp=True,
-                verbose=False,
-                logger=None
-            )
+            # Transcode in one ffmpeg pass; with NVENC, decoded frames stay in GPU memory
+            cmd = [FFMPEG_BINARY, "-y", "-loglevel", "error"]
+            if _nvenc_available():
+                cmd += ["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"]
+            cmd += ["-i", str(input_path)]
+            cmd += _video_encoder_args(bitrate) + ["-c:a", "aac", "-movflags", "+faststart", str(output_path)]
             
-            video_clip.close()
+            await self._run_ffmpeg(cmd)
             
             logger.info(f"Video optimized successfully: {output_path}")
             return str(output_path)
@@ -375,6 +603,16 @@ class VideoService:
             logger.error(f"Failed to optimize video: {e}")
             raise
 
+    async def _run_ffmpeg(self, cmd: List[str]):
+        """Run an ffmpeg command, raising with its stderr on failure"""
+        
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"ffmpeg exited with code {process.returncode}: {stderr.decode(errors='replace').strip()}")
+
     async def extract_thumbnail(
         self,
         video_path: Path,
@@ -384,16 +622,12 @@ class VideoService:
         """Extract thumbnail from video at specified time"""
         
         try:
-            video_clip = mp.VideoFileClip(str(video_path))
-            
-            # Extract frame at specified time
-            frame = video_clip.get_frame(time_seconds)
-            
-            # Convert to PIL Image and save
-            thumbnail = Image.fromarray(frame)
-            thumbnail.save(output_path, "JPEG", quality=85)
-            
-            video_clip.close()
+            # Seek before opening the input so ffmpeg jumps to the nearest keyframe
+            await self._run_ffmpeg([
+                FFMPEG_BINARY, "-y", "-loglevel", "error",
+                "-ss", str(time_seconds), "-i", str(video_path),
+                "-frames:v", "1", "-q:v", "2", str(output_path)
+            ])
             
             logger.info(f"Thumbnail extracted: {output_path}")
             return str(output_path)
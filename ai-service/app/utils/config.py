@@ -1,25 +1,41 @@
 import os
+import functools
 from pathlib import Path
 from typing import Optional
 
+@functools.lru_cache(maxsize=1024)
+def ensure_dir(path_str: str) -> None:
+    """Create a directory (and parents) the first time it is requested in this process"""
+    Path(path_str).mkdir(parents=True, exist_ok=True)
+
 class Settings:
     # Model Configuration
     BASE_MODEL_ID: str = os.getenv("BASE_MODEL_ID", "runwayml/stable-diffusion-v1-5")
     ANIME_LORA_MODEL: str = os.getenv("ANIME_LORA_MODEL", "models/anime_lora.safetensors")
+    LORA_DTYPE: str = os.getenv("LORA_DTYPE", "")  # "fp16" or "bf16" (use bf16 for LoRAs trained in bf16); defaults to model dtype
     MODEL_CACHE_DIR: str = os.getenv("MODEL_CACHE_DIR", "./models")
+    LOW_VRAM: bool = os.getenv("LOW_VRAM", "false").lower() == "true"
+    QUANTIZE_UNET: bool = os.getenv("QUANTIZE_UNET", "false").lower() == "true"
+    COMPILE_UNET: bool = os.getenv("COMPILE_UNET", "false").lower() == "true"  # Warmup captures every resolution x batch size; slow at startup
+    COMPILE_RESOLUTIONS: list = [int(size) for size in os.getenv("COMPILE_RESOLUTIONS", "512,768,1024").split(",")]  # Square sizes warmed at startup; others compile on first use
     
     # Generation Settings
     DEFAULT_WIDTH: int = int(os.getenv("DEFAULT_WIDTH", "512"))
     DEFAULT_HEIGHT: int = int(os.getenv("DEFAULT_HEIGHT", "512"))
-    DEFAULT_STEPS: int = int(os.getenv("DEFAULT_STEPS", "20"))
+    DEFAULT_STEPS: int = int(os.getenv("DEFAULT_STEPS", "15"))
+    QUALITY_STEPS: dict = {"draft": 12, "standard": 20, "high": 28}
     DEFAULT_GUIDANCE: float = float(os.getenv("DEFAULT_GUIDANCE", "7.5"))
     MAX_WIDTH: int = int(os.getenv("MAX_WIDTH", "1024"))
     MAX_HEIGHT: int = int(os.getenv("MAX_HEIGHT", "1024"))
     MAX_STEPS: int = int(os.getenv("MAX_STEPS", "50"))
+    MAX_IMAGE_BATCH: int = int(os.getenv("MAX_IMAGE_BATCH", "4"))
+    IMAGE_QUEUE_SIZE: int = int(os.getenv("IMAGE_QUEUE_SIZE", "64"))
     
     # Video Settings
     DEFAULT_FPS: int = int(os.getenv("DEFAULT_FPS", "24"))
     MAX_FRAMES: int = int(os.getenv("MAX_FRAMES", "120"))
+    MAX_FRAME_BATCH: int = int(os.getenv("MAX_FRAME_BATCH", "8"))
+    VIDEO_ENCODER: str = os.getenv("VIDEO_ENCODER", "auto").lower()  # "auto" (NVENC when available), "nvenc" or "libx264"
     
     # File Storage
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "./uploads")
@@ -49,6 +65,6 @@ class Settings:
     def __init__(self):
         # Create directories
         for directory in [self.MODEL_CACHE_DIR, self.UPLOAD_DIR, self.OUTPUT_DIR, self.TEMP_DIR]:
-            Path(directory).mkdir(parents=True, exist_ok=True)
+            ensure_dir(str(directory))
 
 settings = Settings()
\ No newline at end of file
@@ -1,29 +1,62 @@
 import os
+import mmap
+import asyncio
 import shutil
-import hashlib
 from pathlib import Path
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 import aiofiles
+import blake3
 from PIL import Image
 import logging
 
-from .config import settings
+from .config import settings, ensure_dir
 from .logger import setup_logger
 
 logger = setup_logger(__name__)
 
-async def save_image(image: Image.Image, filename: str, output_dir: Optional[str] = None) -> str:
-    """Save PIL Image to file"""
+# BLAKE3 digest length for file hashes (32 hex characters)
+FILE_HASH_BYTES = 16
+
+# Buffer size for copying video files when sendfile is unavailable
+VIDEO_COPY_CHUNK = 1024 * 1024
+
+# Pillow save options per image format; PNG skips the slow optimize pass and uses zlib level 1
+IMAGE_SAVE_OPTIONS = {
+    "PNG": {"optimize": False, "compress_level": 1},
+    "JPEG": {"quality": 90},
+    "WEBP": {"quality": 85, "method": 4},
+}
+
+IMAGE_FORMAT_BY_EXTENSION = {".png": "PNG", ".jpg": "JPEG", ".jpeg": "JPEG", ".webp": "WEBP"}
+
+async def save_image(
+    image: Image.Image,
+    filename: str,
+    output_dir: Optional[str] = None,
+    fmt: Optional[str] = None,
+    quality: Optional[int] = None
+) -> str:
+    """Save PIL Image to file, as PNG, JPEG or WebP (from fmt or the filename extension, else JPEG)"""
     
     try:
         if output_dir is None:
             output_dir = settings.OUTPUT_DIR
         
         output_path = Path(output_dir) / filename
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        ensure_dir(str(output_path.parent))
+        
+        if fmt is None:
+            fmt = IMAGE_FORMAT_BY_EXTENSION.get(output_path.suffix.lower(), "JPEG")
+        fmt = fmt.upper()
+        
+        options = dict(IMAGE_SAVE_OPTIONS.get(fmt, {}))
+        if quality is not None and fmt != "PNG":
+            options["quality"] = quality
+        if fmt == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
         
-        # Save image
-        image.save(output_path, format='PNG', optimize=True)
+        # Save image off the event loop
+        await asyncio.to_thread(image.save, output_path, format=fmt, **options)
         
         logger.info(f"Image saved: {output_path}")
         return str(output_path)
@@ -32,18 +65,49 @@ async def save_image(image: Image.Image, filename: str, output_dir: Optional[str
         logger.error(f"Failed to save image {filename}: {e}")
         raise
 
-async def save_video(video_data: bytes, filename: str, output_dir: Optional[str] = None) -> str:
-    """Save video data to file"""
+def _copy_file(src_path: Path, dst_path: Path):
+    """Copy a file kernel-side with sendfile, falling back to a buffered copy"""
+    
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        offset = 0
+        try:
+            while remaining > 0:
+                sent = os.sendfile(dst.fileno(), src.fileno(), offset, remaining)
+                if sent == 0:
+                    break
+                offset += sent
+                remaining -= sent
+        except (AttributeError, OSError):
+            # No sendfile between regular files on this platform
+            src.seek(offset)
+            dst.seek(offset)
+            shutil.copyfileobj(src, dst, VIDEO_COPY_CHUNK)
+
+async def save_video(
+    source: Union[bytes, str, os.PathLike, AsyncIterator[bytes]],
+    filename: str,
+    output_dir: Optional[str] = None
+) -> str:
+    """Save video bytes, an existing video file, or an async stream of chunks to file"""
     
     try:
         if output_dir is None:
             output_dir = settings.OUTPUT_DIR
         
         output_path = Path(output_dir) / filename
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        ensure_dir(str(output_path.parent))
         
-        async with aiofiles.open(output_path, 'wb') as f:
-            await f.write(video_data)
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            async with aiofiles.open(output_path, 'wb') as f:
+                await f.write(source)
+        elif isinstance(source, (str, os.PathLike)):
+            if Path(source).resolve() != output_path.resolve():
+                await asyncio.to_thread(_copy_file, Path(source), output_path)
+        else:
+            async with aiofiles.open(output_path, 'wb') as f:
+                async for chunk in source:
+                    await f.write(chunk)
         
         logger.info(f"Video saved: {output_path}")
         return str(output_path)
@@ -52,15 +116,55 @@ async def save_video(video_data: bytes, filename: str, output_dir: Optional[str]
         logger.error(f"Failed to save video {filename}: {e}")
         raise
 
+# Servable output extensions, in lookup priority order
+OUTPUT_MEDIA_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".mp4": "video/mp4",
+    ".gif": "image/gif",
+}
+
+def build_output_index(directory: str) -> Dict[str, Tuple[Path, str]]:
+    """Map output IDs to (path, media type) with a single directory scan"""
+    
+    index: Dict[str, Tuple[Path, str]] = {}
+    priority = list(OUTPUT_MEDIA_TYPES)
+    
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                output_id, ext = os.path.splitext(entry.name)
+                if ext not in OUTPUT_MEDIA_TYPES or not entry.is_file():
+                    continue
+                
+                # Keep the highest-priority extension when an ID has several files
+                existing = index.get(output_id)
+                if existing and priority.index(existing[0].suffix) < priority.index(ext):
+                    continue
+                
+                index[output_id] = (Path(entry.path), OUTPUT_MEDIA_TYPES[ext])
+        
+        logger.info(f"Indexed {len(index)} output files in {directory}")
+        
+    except Exception as e:
+        logger.error(f"Failed to index output files in {directory}: {e}")
+    
+    return index
+
+def _hash_bytes(data) -> str:
+    """Hash a bytes-like object with BLAKE3, using all cores"""
+    
+    return blake3.blake3(data, max_threads=blake3.blake3.AUTO).hexdigest(length=FILE_HASH_BYTES)
+
 def get_file_hash(file_path: str) -> str:
-    """Get MD5 hash of file"""
+    """Get BLAKE3 hash of file"""
     
     try:
-        hash_md5 = hashlib.md5()
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+            if os.fstat(f.fileno()).st_size == 0:
+                return _hash_bytes(b"")  # Empty files cannot be memory-mapped
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return _hash_bytes(data)
         
     except Exception as e:
         logger.error(f"Failed to get hash for {file_path}: {e}")
@@ -79,7 +183,7 @@ def ensure_directory(directory: str) -> None:
     """Ensure directory exists"""
     
     try:
-        Path(directory).mkdir(parents=True, exist_ok=True)
+        ensure_dir(str(directory))
     except Exception as e:
         logger.error(f"Failed to create directory {directory}: {e}")
         raise
@@ -138,6 +242,16 @@ def get_safe_filename(filename: str) -> str:
     
     return safe_filename[:255]  # Limit length
 
+def _write_thumbnail(image_path: str, thumbnail_path: str, size: tuple):
+    """Decode, downscale and JPEG-encode a thumbnail (blocking)"""
+    
+    with Image.open(image_path) as img:
+        # Create thumbnail maintaining aspect ratio
+        img.thumbnail(size, Image.Resampling.LANCZOS)
+        
+        # Save thumbnail
+        img.save(thumbnail_path, format='JPEG', quality=85, optimize=True, progressive=True, subsampling=2)
+
 async def create_thumbnail(
     image_path: str, 
     thumbnail_path: str, 
@@ -146,12 +260,8 @@ async def create_thumbnail(
     """Create thumbnail from image"""
     
     try:
-        with Image.open(image_path) as img:
-            # Create thumbnail maintaining aspect ratio
-            img.thumbnail(size, Image.Resampling.LANCZOS)
-            
-            # Save thumbnail
-            img.save(thumbnail_path, format='JPEG', quality=85, optimize=True)
+        # Decode and encode off the event loop; PIL releases the GIL in libjpeg
+        await asyncio.to_thread(_write_thumbnail, image_path, thumbnail_path, size)
         
         logger.info(f"Thumbnail created: {thumbnail_path}")
         return thumbnail_path
@@ -1,22 +1,26 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
 from typing import Optional
 
 from .config import settings
 
-def setup_logger(name: str, level: Optional[str] = None) -> logging.Logger:
-    """Set up logger with consistent formatting"""
-    
-    logger = logging.getLogger(name)
-    
-    # Don't add handlers if they already exist
-    if logger.handlers:
-        return logger
+# Rotate log files at 10 MB, keeping 5 old files of each
+LOG_MAX_BYTES = 10_000_000
+LOG_BACKUP_COUNT = 5
+
+_root_configured = False
+
+def _configure_root_logger():
+    """Route root logger records to the console and file handlers, once per process"""
     
-    # Set level
-    log_level = level or settings.LOG_LEVEL
-    logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
+    global _root_configured
+    if _root_configured:
+        return
+    _root_configured = True
     
     # Create formatter
     formatter = logging.Formatter(
@@ -27,20 +31,49 @@ def setup_logger(name: str, level: Optional[str] = None) -> logging.Logger:
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
     
     # File handler (if needed)
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
     
-    file_handler = logging.FileHandler(log_dir / "ai_service.log")
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_dir / "ai_service.log", maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT
+    )
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
     
     # Error file handler
-    error_handler = logging.FileHandler(log_dir / "ai_service_error.log")
+    error_handler = logging.handlers.RotatingFileHandler(
+        log_dir / "ai_service_error.log", maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT
+    )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(formatter)
-    logger.addHandler(error_handler)
     
-    return logger
\ No newline at end of file
+    # Loggers only enqueue records; a background thread formats and writes them
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, error_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO))
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+def setup_logger(name: str, level: Optional[str] = None) -> logging.Logger:
+    """Set up logger with consistent formatting
+    
+    Handlers live on the root logger; named loggers only set their level and propagate,
+    so every module shares one set of open log files.
+    """
+    
+    _configure_root_logger()
+    
+    logger = logging.getLogger(name)
+    
+    # Set level
+    log_level = level or settings.LOG_LEVEL
+    logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
+    logger.propagate = True
+    
+    return logger
@@ -5,11 +5,18 @@ from fastapi.responses import JSONResponse
 import logging
 import sys
 import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import PIL
+from PIL import features
 
 from app.models.model_manager import ModelManager
 from app.routers import generation, health
 from app.utils.config import settings
 from app.utils.logger import setup_logger
+from app.utils.file_utils import build_output_index
+from app.services._kernels import warmup_kernels
+from app.services.audio_service import warmup_audio_kernels
 
 app = FastAPI(
     title="Anime AI Generation Service",
@@ -42,6 +49,18 @@ async def startup_event():
     """Initialize models and services on startup"""
     logger.info("🚀 Starting Anime AI Generation Service...")
     
+    # asyncio.to_thread work (image encoding, file writes, audio/video rendering) is CPU-bound,
+    # so size its pool to the cores instead of the default min(32, cpus + 4); GPU work has its own
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="cpu")
+    )
+    
+    # Image encoding speed depends on the Pillow build (Pillow-SIMD / libjpeg-turbo)
+    if features.check_feature("libjpeg_turbo"):
+        logger.info(f"Pillow {PIL.__version__} using libjpeg-turbo {features.version('jpg')}")
+    else:
+        logger.warning("Pillow is not built against libjpeg-turbo; JPEG encoding will be slower")
+    
     try:
         # Initialize model manager
         model_manager = ModelManager()
@@ -50,6 +69,13 @@ async def startup_event():
         # Store in app state for access in routes
         app.state.model_manager = model_manager
         
+        # Index existing outputs so lookups skip per-extension stat probing
+        app.state.output_index = build_output_index(settings.OUTPUT_DIR)
+        
+        # Compile numba kernels now rather than on the first video / music request
+        warmup_kernels()
+        warmup_audio_kernels()
+        
         logger.info("✅ AI service startup completed successfully")
         
     except Exception as e: